@@ -1 +1,10 @@
 """L88-Full Backend — Agentic RAG system."""
+
+import os
+
+from l88_backend.config import TORCH_NUM_THREADS
+
+# OpenMP / MKL read these once when torch loads, so they must be set before
+# any submodule imports it. Explicit values in the environment win.
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_NUM_THREADS))
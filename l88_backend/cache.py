@@ -2,37 +2,142 @@
 Query cache — exact-match hashing with TTL.
 
 Checks cache before the graph runs. If hit, returns immediately.
-Keys are SHA256(session_id + query). TTL default: 1 hour.
+Keys are xxh3_64(session_id + query) as plain ints — the key only feeds
+a dict lookup, so a cryptographic hash is wasted work. TTL default: 1 hour.
+
+Expired entries are swept from a min-heap of expiry times every
+SWEEP_EVERY calls, so cold entries don't live forever. Size is capped at
+MAX_ENTRIES with least-recently-used eviction.
+
+Entries are spread over NSHARDS OrderedDicts by the low key bits, each with
+its own lock, so concurrent workers only contend on the same shard and a
+resize rehashes one shard rather than the whole cache. The session index
+and expiry heap share _meta_lock. Lock order is always shard → meta.
 """
 
-import hashlib
+import functools
+import heapq
+import threading
 import time
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple
+
+import xxhash
 
-_cache: dict = {}
 TTL_SECONDS = 60 * 60  # 1 hour
+MAX_ENTRIES = 10_000
+SWEEP_EVERY = 64       # cache calls between expiry sweeps
+NSHARDS = 16           # power of two — shard = key & (NSHARDS - 1)
+
+
+
+class Entry(NamedTuple):
+    """One cached response. A tuple is ~3x smaller per entry than a dict."""
+    result: dict
+    ts: float
+    session_id: str
+
+
+_SHARD_MAX = MAX_ENTRIES // NSHARDS
+_shards: list[OrderedDict] = [OrderedDict() for _ in range(NSHARDS)]
+_locks: list[threading.Lock] = [threading.Lock() for _ in range(NSHARDS)]
+
+_meta_lock = threading.Lock()
+_session_index: dict[str, set] = defaultdict(set)   # session_id → cache keys
+_exp_heap: list[tuple[float, int]] = []             # (expires_at, key)
+_ops = 0
+
+# Hot-path callables bound once to skip module attribute lookups.
+# Monotonic clock: immune to NTP / wall-clock steps.
+_now = time.monotonic
+_xxh3 = xxhash.xxh3_64_intdigest
+
+
+@functools.lru_cache(maxsize=1024)
+def _make_key(session_id: str, query: str) -> int:
+    # Memoized: run_chat probes and then stores under the same raw query,
+    # so the second call skips normalization and hashing.
+    return _xxh3(session_id.encode() + b"\x00" + query.strip().lower().encode())
+
+
+def _shard(key: int) -> int:
+    return key & (NSHARDS - 1)
+
+
+def _drop_locked(shard: OrderedDict, key: int) -> None:
+    """Remove one entry and its session-index reference. Caller holds the shard lock."""
+    entry = shard.pop(key, None)
+    if entry is None:
+        return
+    with _meta_lock:
+        keys = _session_index.get(entry.session_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _session_index[entry.session_id]
+
+
+def _sweep_expired() -> None:
+    """Pop every heap entry whose expiry has passed and drop its cache entry."""
+    now = _now()
+    expired = []
+    with _meta_lock:
+        while _exp_heap and _exp_heap[0][0] <= now:
+            expired.append(heapq.heappop(_exp_heap))
+
+    for exp, key in expired:
+        i = _shard(key)
+        with _locks[i]:
+            entry = _shards[i].get(key)
+            # Skip stale heap records for keys that were re-set since
+            if entry is not None and entry.ts + TTL_SECONDS <= exp:
+                _drop_locked(_shards[i], key)
 
 
-def _make_key(session_id: str, query: str) -> str:
-    raw = f"{session_id}:{query.strip().lower()}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+def _maybe_sweep() -> None:
+    """Amortize the sweep over SWEEP_EVERY cache calls."""
+    global _ops
+    with _meta_lock:
+        _ops += 1
+        due = _ops >= SWEEP_EVERY
+        if due:
+            _ops = 0
+    if due:
+        _sweep_expired()
 
 
 def cache_get(session_id: str, query: str) -> dict | None:
     """Return cached result if it exists and hasn't expired."""
+    _maybe_sweep()
     key = _make_key(session_id, query)
-    entry = _cache.get(key)
-    if not entry:
-        return None
-    if time.time() - entry["ts"] > TTL_SECONDS:
-        del _cache[key]
-        return None
-    return entry["result"]
+    i = _shard(key)
+    with _locks[i]:
+        shard = _shards[i]
+        entry = shard.get(key)
+        if entry is None:
+            return None
+        if _now() - entry.ts > TTL_SECONDS:
+            _drop_locked(shard, key)
+            return None
+        shard.move_to_end(key)
+        return entry.result
 
 
 def cache_set(session_id: str, query: str, result: dict) -> None:
     """Store a result in the cache."""
+    _maybe_sweep()
     key = _make_key(session_id, query)
-    _cache[key] = {"result": result, "ts": time.time()}
+    ts = _now()
+    i = _shard(key)
+    with _locks[i]:
+        shard = _shards[i]
+        if key not in shard and len(shard) >= _SHARD_MAX:
+            _drop_locked(shard, next(iter(shard)))  # least recently used
+        shard[key] = Entry(result, ts, session_id)
+        shard.move_to_end(key)
+        with _meta_lock:
+            heapq.heappush(_exp_heap, (ts + TTL_SECONDS, key))
+            _session_index[session_id].add(key)
 
 
 def cache_invalidate_session(session_id: str) -> None:
@@ -40,7 +145,9 @@ def cache_invalidate_session(session_id: str) -> None:
     Clear all cache entries for a session.
     Call this when a new document is uploaded to the session.
     """
-    prefix = hashlib.sha256(f"{session_id}:".encode()).hexdigest()[:8]
-    to_delete = [k for k in _cache if _cache[k].get("session_id") == session_id]
-    for k in to_delete:
-        del _cache[k]
+    with _meta_lock:
+        keys = _session_index.pop(session_id, ())
+    for k in keys:
+        i = _shard(k)
+        with _locks[i]:
+            _shards[i].pop(k, None)
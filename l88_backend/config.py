@@ -17,41 +17,97 @@ HARDCODED_USERS = [
 
 import os
 
-_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Paths are normalized once here so ".." never reaches downstream open()/stat()
+_BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+_ROOT_DIR = os.path.dirname(_BASE_DIR)
 
-STORAGE_DIR         = os.path.join(_BASE_DIR, "..", "storage")
+STORAGE_DIR         = os.path.join(_ROOT_DIR, "storage")
 SESSION_STORAGE     = os.path.join(STORAGE_DIR, "sessions")
 LIBRARY_STORAGE     = os.path.join(STORAGE_DIR, "library")
-DATABASE_URL        = f"sqlite:///{os.path.join(STORAGE_DIR, '..', 'l88.db')}"
+CACHE_STORAGE       = os.path.join(STORAGE_DIR, "cache")
+MODEL_STORAGE       = os.path.join(STORAGE_DIR, "models")   # exported ONNX graphs
+DATABASE_URL        = f"sqlite:///{os.path.join(_ROOT_DIR, 'l88.db')}"
 
 # ── Ingestion ────────────────────────────────────────────────────────
 
 CHUNK_SIZE          = 380       # tokens per chunk
 CHUNK_OVERLAP       = 45        # token overlap between chunks
+PARSE_CACHE_TTL_S   = 30 * 24 * 3600  # cached parse + chunk results per PDF content hash
+SELECTED_IDS_TTL_S  = 60        # per-session selected doc IDs reuse window (other workers' toggles)
 
 # ── Retrieval ────────────────────────────────────────────────────────
 
 RETRIEVE_TOP_K      = 20        # FAISS candidates per query
 RERANK_TOP_N        = 7         # final chunks after reranking
+LIBRARY_INDEX_TYPE  = os.environ.get("L88_LIBRARY_INDEX", "flat")  # flat | hnsw | sq8 (1 byte/dim); new indexes only
+LIBRARY_HNSW_MIN_VECTORS = 50_000  # a flat library index switches to HNSW past this size
+HNSW_M              = 32        # HNSW graph degree
+HNSW_EF_CONSTRUCTION = 200      # build-time candidate list (higher = better graph)
+HNSW_EF_SEARCH      = 64        # query-time candidate list (higher = better recall)
+INDEX_FLUSH_INTERVAL_S = 0.5    # modified indexes are saved at most this often (coalesces upload bursts)
+INDEX_RESIDENT_MAX  = 64        # saved stores kept open for the next upload to the same index
+FAISS_NUM_THREADS   = int(os.environ.get("L88_FAISS_THREADS") or os.cpu_count() or 1)  # OpenMP threads for FAISS search
 MAX_REWRITES        = 2         # max retry loops (0, 1, 2)
 MAX_ALT_QUERIES     = 3         # max rewritten queries per pass
+REWRITER_TIMEOUT_S  = 3.0       # fall back to the raw query if the rewriter LLM is slower
+REWRITER_DISK_TTL_S = 7 * 24 * 3600  # persisted rewrites older than this are ignored
+EVAL_GOOD_SCORE     = 0.7       # top rerank_score → GOOD / confident
+EVAL_UNSURE_SCORE   = 0.4       # top rerank_score → UNSURE (below → BAD)
+
+# ── Summarization ────────────────────────────────────────────────────
+
+SUMMARY_SECTION_CHUNKS = 8      # chunks (~CHUNK_SIZE tokens each) per map call
+SUMMARY_MAX_WORKERS    = 4      # concurrent map calls
 
 # ── Models ───────────────────────────────────────────────────────────
 
+# Intra-op threads for torch / ONNX Runtime (embedder + reranker share the
+# process-wide pool). CPU encoders scale to ~4-8 cores; more just contend.
+TORCH_NUM_THREADS   = int(os.environ.get("L88_TORCH_THREADS") or min(8, os.cpu_count() or 1))
 EMBED_MODEL         = "BAAI/bge-base-en-v1.5"
 EMBED_PREFIX        = "Represent this sentence for searching relevant passages: "
 RERANKER_MODEL      = "BAAI/bge-reranker-v2-m3"
+RERANKER_MODEL_FAST = "cross-encoder/ms-marco-MiniLM-L-6-v2"  # 6-layer, ~10x cheaper per pair
+FAST_RERANK         = os.environ.get("L88_FAST_RERANK", "0") == "1"  # default to the fast model
+RERANK_CACHE_MAX    = 50_000                    # memoized (query, chunk) scores (LRU)
+RERANK_BATCH_SIZE   = 32                        # pairs per cross-encoder mini-batch
+RERANK_BACKEND      = os.environ.get("L88_RERANK_BACKEND", "torch")  # torch | onnx
+RERANK_ONNX_QUANTIZE = True     # int8 dynamic quantization (scores only, nothing persisted)
+QUERY_EMBED_CACHE_MAX = 4096                    # memoized query embeddings (LRU)
+EMBED_DISK_TTL_S    = 30 * 24 * 3600  # persisted chunk embeddings older than this are re-encoded
+EMBED_DEVICE        = os.environ.get("L88_EMBED_DEVICE")  # cuda|mps|cpu; unset → autodetect
+EMBED_BACKEND       = os.environ.get("L88_EMBED_BACKEND", "torch")  # torch | onnx
+EMBED_DTYPE         = os.environ.get("L88_EMBED_DTYPE", "auto")  # auto|float32|float16|bfloat16
+EMBED_ONNX_QUANTIZE = False     # int8 dynamic quantization (re-ingest: vectors shift slightly)
+EMBED_BATCH_SIZE    = 32                        # texts per encode mini-batch
+EMBED_QUEUE_MAX_ITEMS = int(os.environ.get("L88_EMBED_QUEUE_MAX_ITEMS", 64))   # texts coalesced per ingest embed
+EMBED_QUEUE_WAIT_MS = float(os.environ.get("L88_EMBED_QUEUE_WAIT_MS", 25))    # wait for concurrent ingests to join
+
+# Common opening questions, embedded once at startup so they never pay BGE latency
+WARM_QUERIES = [
+    "summarize this document",
+    "what is this document about",
+    "what are the main findings",
+    "what are the key conclusions",
+    "what methodology was used",
+    "what are the limitations",
+    "give an overview",
+    "what are the key results",
+]
 
+OLLAMA_BASE_URL     = "http://localhost:11434"
 LLM_MODEL           = "qwen2.5-7b-awq"         # GPU: ~15-25 tok/s on RTX 4000
 LLM_MODEL_FALLBACK  = "qwen2.5:14b"            # CPU fallback: ~2-4 tok/s
 LLM_TEMPERATURE     = 0
 LLM_NUM_CTX         = 16384                      # override Ollama default of 4096
+LLM_KEEP_ALIVE      = "30m"                      # keep model + prefix KV cache loaded
 
 # ── Auth ─────────────────────────────────────────────────────────────
 
 JWT_SECRET          = "change-this"
 JWT_ALGORITHM       = "HS256"
 JWT_EXPIRE_MINUTES  = 60 * 8                    # 8 hours
+TOKEN_CACHE_TTL_S   = 30                        # resolved token → User reuse window
 
 # ── Role Hierarchy ───────────────────────────────────────────────────
 
@@ -7,6 +7,7 @@ Creates all tables on startup. Seeds hardcoded users on first run.
 from contextlib import contextmanager
 
 import bcrypt
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, Session, create_engine, select
 
 from l88_backend.config import DATABASE_URL, HARDCODED_USERS
@@ -20,9 +21,31 @@ from l88_backend.models import (  # noqa: F401
 engine = create_engine(DATABASE_URL, echo=False)
 
 
+# Columns added after the first release: create_all() only creates missing
+# tables, so existing databases get these via ALTER TABLE on startup.
+_ADDED_COLUMNS = {
+    "document": {"status": "VARCHAR NOT NULL DEFAULT 'ready'"},
+}
+
+
+def _add_missing_columns():
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {c["name"] for c in insp.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
 def create_db_and_tables():
-    """Create all tables if they don't exist."""
+    """Create all tables if they don't exist, then add any newer columns and indexes."""
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    # create_all skips indexes of tables that already exist
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 @contextmanager
@@ -40,11 +63,14 @@ def seed_users():
     on every startup.
     """
     with get_session() as db:
+        # One query to learn which usernames already exist
+        existing = set(db.exec(
+            select(User.username).where(
+                User.username.in_([u["username"] for u in HARDCODED_USERS])
+            )
+        ).all())
         for u in HARDCODED_USERS:
-            existing = db.exec(
-                select(User).where(User.username == u["username"])
-            ).first()
-            if existing:
+            if u["username"] in existing:
                 continue
             user = User(
                 username=u["username"],
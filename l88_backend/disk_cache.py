@@ -0,0 +1,120 @@
+"""
+Disk cache — persistent bytes → JSON map in SQLite, shared across sessions
+and process restarts.
+
+Used for results that are expensive to recompute but stable across
+restarts (first-attempt query rewrites, chunk embeddings). get/put store
+orjson-encoded dicts; get_blobs/put_blob store raw bytes untouched. Rows are
+stamped with a wall-clock write time. Reads check the caller's TTL. Writes are
+queued and flushed in one transaction by a background thread, so callers
+never wait on fsync. A batch whose flush fails (locked database, full disk)
+is logged and dropped — entries are recomputable — and the flusher keeps
+going.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import orjson
+
+from l88_backend.config import CACHE_STORAGE
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY_S = 1.0
+_MAX_PARAMS = 500   # keys per IN (...) lookup, under SQLite's host-parameter limit
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS kv (
+    ns  TEXT NOT NULL,
+    key BLOB NOT NULL,
+    ts  REAL NOT NULL,
+    val BLOB NOT NULL,
+    PRIMARY KEY (ns, key)
+)"""
+
+
+class DiskCache:
+    """One namespace in the shared SQLite cache file."""
+
+    _conn: sqlite3.Connection | None = None
+    _lock = threading.Lock()
+    _pending: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+
+    def __init__(self, namespace: str, ttl_seconds: float):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def _db(cls) -> sqlite3.Connection:
+        """Open the cache file once per process (caller holds _lock)."""
+        if cls._conn is None:
+            os.makedirs(CACHE_STORAGE, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(CACHE_STORAGE, "cache.sqlite3"),
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            cls._conn = conn
+            threading.Thread(target=cls._flusher, name="disk-cache", daemon=True).start()
+        return cls._conn
+
+    @classmethod
+    def _flusher(cls) -> None:
+        """Drain queued writes into one transaction per FLUSH_EVERY_S."""
+        while True:
+            rows = [cls._pending.get()]
+            time.sleep(FLUSH_EVERY_S)
+            while not cls._pending.empty():
+                rows.append(cls._pending.get_nowait())
+            try:
+                with cls._lock:
+                    with cls._conn:
+                        cls._conn.executemany(
+                            "INSERT OR REPLACE INTO kv (ns, key, ts, val) VALUES (?, ?, ?, ?)", rows
+                        )
+            except sqlite3.Error as exc:
+                logger.warning("Disk cache flush failed, dropped %d writes: %s", len(rows), exc)
+
+    def get(self, key: bytes) -> dict | None:
+        """Return the stored value for `key` if present and within TTL."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT ts, val FROM kv WHERE ns = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl_seconds:
+            return None
+        return orjson.loads(row[1])
+
+    def put(self, key: bytes, value: dict) -> None:
+        """Queue `value` for the next background flush."""
+        with self._lock:
+            self._db()
+        self._pending.put((self.namespace, key, time.time(), orjson.dumps(value)))
+
+    def get_blobs(self, keys: list[bytes]) -> dict[bytes, bytes]:
+        """Raw values for every key present and within TTL, batched into IN lookups."""
+        found: dict[bytes, bytes] = {}
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            db = self._db()
+            for i in range(0, len(keys), _MAX_PARAMS):
+                batch = keys[i:i + _MAX_PARAMS]
+                rows = db.execute(
+                    f"SELECT key, val FROM kv WHERE ns = ? AND ts >= ? "
+                    f"AND key IN ({','.join('?' * len(batch))})",
+                    (self.namespace, cutoff, *batch),
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_blob(self, key: bytes, value: bytes) -> None:
+        """Queue raw `value` for the next background flush."""
+        with self._lock:
+            self._db()
+        self._pending.put((self.namespace, key, time.time(), value))
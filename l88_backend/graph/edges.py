@@ -20,6 +20,27 @@ def route_after_router(state: L88State) -> str:
     return state["route"]
 
 
+# (verdict, retries exhausted) → next node. Verdicts are validated upstream
+# (generator / self_evaluator), so every reachable key is present.
+_GEN_ROUTE = {
+    ("SUFFICIENT", False): "self_evaluator",
+    ("SUFFICIENT", True):  "self_evaluator",
+    ("GAP", False):        "query_rewriter",
+    ("GAP", True):         "self_evaluator",   # proceed with caveat
+    ("EMPTY", False):      "query_rewriter",
+    ("EMPTY", True):       "not_found",
+}
+
+_EVAL_ROUTE = {
+    ("GOOD", False):   "output",
+    ("GOOD", True):    "output",
+    ("UNSURE", False): "query_rewriter",
+    ("UNSURE", True):  "output",
+    ("BAD", False):    "query_rewriter",
+    ("BAD", True):     "output",
+}
+
+
 def route_after_generator(state: L88State) -> str:
     """
     After Generator node.
@@ -36,18 +57,8 @@ def route_after_generator(state: L88State) -> str:
 
     verdict = state.get("context_verdict", "SUFFICIENT")
     rewrite_count = state.get("rewrite_count", 0)
+    return _GEN_ROUTE[(verdict, rewrite_count >= MAX_REWRITES)]
 
-    if verdict == "SUFFICIENT":
-        return "self_evaluator"
-
-    if rewrite_count < MAX_REWRITES:
-        return "query_rewriter"
-
-    if verdict == "EMPTY":
-        return "not_found"
-
-    # GAP exhausted — proceed with caveat
-    return "self_evaluator"
 
 def route_after_self_eval(state: L88State) -> str:
     """
@@ -59,11 +70,4 @@ def route_after_self_eval(state: L88State) -> str:
     """
     verdict = state.get("verdict", "GOOD")
     rewrite_count = state.get("rewrite_count", 0)
-
-    if verdict == "GOOD":
-        return "output"
-
-    if rewrite_count < MAX_REWRITES:
-        return "query_rewriter"
-
-    return "output"
+    return _EVAL_ROUTE[(verdict, rewrite_count >= MAX_REWRITES)]
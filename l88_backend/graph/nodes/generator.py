@@ -10,20 +10,31 @@ Handles:
   - found=True → structured generation with context evaluation
 
 Writes last_verdict from context_verdict before returning.
+Structured generations are memoized on (query, chunk ids).
 """
 
-import json
+import re
+import threading
+from collections import OrderedDict
+from io import StringIO
+
+import orjson
+import xxhash
 
 from l88_backend.graph.state import L88State
 from l88_backend.llm.client import call_llm
 
-_GENERATOR_PROMPT = """You are Paramanandha, a scientific research assistant developed by L88 Laboratories.
-Answer the user's question using ONLY the provided source chunks.
+# Memo of structured generations keyed on (query, chunk ids). A retry whose
+# rewrite retrieves the same chunk set skips the LLM entirely.
+_memo: OrderedDict[int, tuple] = OrderedDict()
+_memo_lock = threading.Lock()
+MEMO_MAX_ENTRIES = 512
 
-User question: {query}
-
-Source chunks:
-{chunks_text}
+# Static instructions go first (sent as the system message) and the
+# per-request query + chunks last, so the LLM server can reuse the KV cache
+# for the shared prefix instead of re-prefilling it on every call.
+_GENERATOR_SYSTEM = """You are Paramanandha, a scientific research assistant developed by L88 Laboratories.
+Answer the user's question using ONLY the provided source chunks.
 
 Instructions:
 1. STRICT GROUNDING: You are in "Strict Grounding Mode". You must answer using ONLY the information found in the provided Source Chunks.
@@ -34,13 +45,21 @@ Instructions:
 6. Reasoning: Show your full chain of thought in a <think> block.
 
 Return ONLY valid JSON:
-{{
+{
   "context_verdict": "SUFFICIENT" or "GAP" or "EMPTY",
   "reasoning": "<think>your chain of thought</think>",
   "answer": "your direct answer with citations or a statement that info is missing",
   "missing_info": "what is absent (only if GAP, else empty string)",
-  "sources": [{{"filename": "...", "page": N, "excerpt": "relevant quote"}}]
-}}"""
+  "sources": [{"filename": "...", "page": N, "excerpt": "relevant quote"}]
+}"""
+
+# Dynamic suffix — plain concatenation, no .format() over a template
+_USER_HEAD = "User question: "
+_USER_MID = "\n\nSource chunks:\n"
+
+_VERDICTS = ("SUFFICIENT", "GAP", "EMPTY")
+# Checked in order — first keyword found in a free-form verdict wins
+_VERDICT_KEYWORDS = {"sufficient": "SUFFICIENT", "gap": "GAP", "empty": "EMPTY"}
 
 _CHAT_PROMPT = """You are Paramanandha, a helpful scientific research assistant developed by L88 Laboratories. 
 Answer the following question using your internal training knowledge, as no specific documentation has been provided for this query.
@@ -58,20 +77,34 @@ Instructions:
 4. IMPORTANT: Do NOT use JSON formatting, code blocks for reasoning, or structured fields. Answer in plain natural language."""
 
 
-import re
+# LLMs often forget to escape newlines in long text fields. Each pattern
+# matches "field": " ... " — the field name, a colon, a quote, then anything
+# UNTIL a quote followed by a comma or closing brace.
+_FIELD_PATTERNS = [
+    re.compile(f'("{field}"\\s*:\\s*")(.*?)("(?=\\s*[,}}]))', re.DOTALL)
+    for field in ("reasoning", "answer", "missing_info", "excerpt")
+]
+
 
-def _extract_json(text: str) -> str:
-    """Robustly extract and clean JSON from a string."""
+def _escape_newlines(match: re.Match) -> str:
+    """Replace literal newlines inside a matched JSON string value with \\n."""
+    prefix, content, suffix = match.groups()
+    return prefix + content.replace("\n", "\\n").replace("\r", "\\n") + suffix
+
+
+def _repair_json(text: str) -> str:
+    """Strip code fences and escape raw newlines so malformed JSON parses."""
     text = text.strip()
     
     # 1. Remove markdown code fences
-    if "```" in text:
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        else:
-            parts = text.split("```")
-            if len(parts) >= 3:
-                text = parts[1].strip()
+    #    (partition: one forward scan, no list of split parts)
+    _, fence, rest = text.partition("```")
+    if fence:
+        inner, closed, _ = rest.partition("```")
+        if inner.startswith("json"):
+            text = inner[4:].strip()
+        elif closed:
+            text = inner.strip()
 
     # 2. Find the first '{' and last '}'
     start = text.find('{')
@@ -82,25 +115,87 @@ def _extract_json(text: str) -> str:
     json_str = text[start:end+1]
 
     # 3. CRITICAL: Handle unescaped newlines in JSON strings (common with LLMs)
+    for pattern in _FIELD_PATTERNS:
+        json_str = pattern.sub(_escape_newlines, json_str)
+    return json_str
+
+
+def _parse_json(text: str) -> dict:
+    """
+    Parse the generator's JSON response.
+
+    Fast path: orjson on the outermost {...} span — well-formed output never
+    touches the regex repair. Raises orjson.JSONDecodeError if repair fails too.
+    """
+    start = text.find('{')
+    end = text.rfind('}')
+    if start != -1 and end > start:
+        try:
+            return orjson.loads(text[start:end+1])
+        except orjson.JSONDecodeError:
+            pass
+    return orjson.loads(_repair_json(text))
+
+
+def _memo_key(query: str, chunks: list[dict]) -> int:
+    """Content address for a generator call: the query plus the chunk identities."""
+    ids = sorted(f"{c.get('doc_id', '')}:{c.get('chunk_idx', 0)}" for c in chunks)
+    return xxhash.xxh3_64_intdigest(query.encode() + b"|" + ",".join(ids).encode())
+
+
+def _generate(query: str, chunks: list[dict]) -> tuple:
+    """
+    Run the structured LLM call for one (query, chunks) pair.
+
+    Returns:
+        (context_verdict, reasoning, answer, sources, missing_info)
+    """
+    buf = StringIO()
+    for i, c in enumerate(chunks):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"[{c.get('filename', '?')}, page {c.get('page', '?')}]:\n{c.get('text', '')}")
+
+    prompt = _USER_HEAD + query + _USER_MID + buf.getvalue()
+
+    response = call_llm(prompt, system=_GENERATOR_SYSTEM)
+
+    # Parse JSON response
     try:
-        json.loads(json_str)
-        return json_str
-    except json.JSONDecodeError:
-        # LLMs often forget to escape newlines in long text fields.
-        # We target known string fields and escape newlines within them.
-        for field in ["reasoning", "answer", "missing_info", "excerpt"]:
-            # Pattern: "field": " ... " (greedy matching inside quotes, but careful with closing)
-            # This regex looks for the field name, followed by a colon, then a quote,
-            # then anything UNTIL it sees a quote followed by a comma or closing brace.
-            pattern = f'("{field}"\\s*:\\s*")(.*?)("(?=\\s*[,}}]))'
-            def replace_nl(match):
-                prefix, content, suffix = match.groups()
-                # Replace literal newlines with escaped \n
-                return prefix + content.replace("\n", "\\n").replace("\r", "\\n") + suffix
-            
-            json_str = re.sub(pattern, replace_nl, json_str, flags=re.DOTALL)
-            
-        return json_str
+        result = _parse_json(response)
+        context_verdict = result.get("context_verdict", "SUFFICIENT")
+        reasoning = result.get("reasoning", "")
+        answer = result.get("answer", "")
+        missing_info = result.get("missing_info", "")
+        sources = result.get("sources", [])
+        
+        # Attach source metadata (session vs library) by matching filenames
+        if sources:
+            source_map = {c["filename"]: c.get("source", "session") for c in chunks}
+            for s in sources:
+                s["source"] = source_map.get(s.get("filename"), "session")
+
+    except (orjson.JSONDecodeError, KeyError):
+        # Fallback: treat raw response as the answer
+        context_verdict = "SUFFICIENT"
+        reasoning = ""
+        answer = response.strip()
+        missing_info = ""
+        sources = []
+
+    # Validate verdict
+    if context_verdict not in _VERDICTS:
+        # If the LLM returned something else, it might have just put the answer in the field
+        # or we might need to search for keywords.
+        vl = str(context_verdict).lower()
+        for keyword, verdict in _VERDICT_KEYWORDS.items():
+            if keyword in vl:
+                context_verdict = verdict
+                break
+        else:
+            context_verdict = "SUFFICIENT"
+
+    return context_verdict, reasoning, answer, sources, missing_info
 
 
 def generator_node(state: L88State) -> dict:
@@ -139,56 +234,26 @@ def generator_node(state: L88State) -> dict:
 
     # ── RAG generation: single structured LLM call ───────────────
     chunks = state.get("chunks", [])
-    chunks_text = "\n\n".join(
-        f"[{c.get('filename', '?')}, page {c.get('page', '?')}]:\n{c.get('text', '')}"
-        for c in chunks
-    )
-
-    prompt = _GENERATOR_PROMPT.format(
-        query=state["query"],
-        chunks_text=chunks_text,
-    )
-
-    response = call_llm(prompt)
-    clean_json = _extract_json(response)
-
-    # Parse JSON response
-    try:
-        result = json.loads(clean_json)
-        context_verdict = result.get("context_verdict", "SUFFICIENT")
-        reasoning = result.get("reasoning", "")
-        answer = result.get("answer", "")
-        missing_info = result.get("missing_info", "")
-        sources = result.get("sources", [])
-        
-        # Attach source metadata (session vs library) by matching filenames
-        source_map = {c.get("filename"): c.get("source", "session") for c in chunks}
-        for s in sources:
-            fname = s.get("filename")
-            s["source"] = source_map.get(fname, "session")
-
-    except (json.JSONDecodeError, KeyError):
-        # Fallback: treat raw response as the answer
-        context_verdict = "SUFFICIENT"
-        reasoning = ""
-        answer = response.strip()
-        missing_info = ""
-        sources = []
+    key = _memo_key(state["query"], chunks)
+    with _memo_lock:
+        cached = _memo.get(key)
+        if cached is not None:
+            _memo.move_to_end(key)
+    if cached is None:
+        # LLM call outside the lock: concurrent chats don't queue behind it
+        cached = _generate(state["query"], chunks)
+        with _memo_lock:
+            _memo[key] = cached
+            while len(_memo) > MEMO_MAX_ENTRIES:
+                _memo.popitem(last=False)
 
-    # Validate verdict
-    if context_verdict not in ("SUFFICIENT", "GAP", "EMPTY"):
-        # If the LLM returned something else, it might have just put the answer in the field
-        # or we might need to search for keywords.
-        if "sufficient" in context_verdict.lower(): context_verdict = "SUFFICIENT"
-        elif "gap" in context_verdict.lower(): context_verdict = "GAP"
-        elif "empty" in context_verdict.lower(): context_verdict = "EMPTY"
-        else: context_verdict = "SUFFICIENT"
+    context_verdict, reasoning, answer, sources, missing_info = cached
 
     return {
         "context_verdict": context_verdict,
         "reasoning": reasoning,
         "answer": answer,
-        "sources": sources,
+        "sources": [dict(s) for s in sources],
         "missing_info": missing_info,
         "last_verdict": context_verdict,
         "retrieval_metadata": state.get("retrieval_metadata", {}),
@@ -6,16 +6,39 @@ a genuinely different angle. Outputs 1-3 rewritten queries.
 
 Key improvement: explicitly instructs the LLM to expand acronyms and
 abbreviations, which is the #1 cause of retrieval misses.
+
+The LLM call is raced against REWRITER_TIMEOUT_S: if it hasn't answered
+in time, retrieval proceeds with the raw query instead of stalling the graph.
+First-attempt results are kept in a semantic cache and persisted to disk.
 """
 
-import json
+import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import orjson
 
 from l88_backend.graph.state import L88State
-from l88_backend.llm.client import call_llm
+from l88_backend.config import REWRITER_TIMEOUT_S, REWRITER_DISK_TTL_S
+from l88_backend.disk_cache import DiskCache
+from l88_backend.ingestion.embedder import embed_texts
+from l88_backend.llm.client import call_llm_cached
+from l88_backend.semantic_cache import SemanticCache
+
+_LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rewriter")
+
+# First-attempt rewrites by normalized query, with cosine ≥ 0.95 fallback
+# over BGE query embeddings for reworded follow-ups.
+_semantic_cache = SemanticCache(capacity=10_000, threshold=0.95)
+
+# Exact normalized query → first-attempt rewrite, persisted across restarts
+_disk_cache = DiskCache("rewriter", ttl_seconds=REWRITER_DISK_TTL_S)
 
 
-_REWRITER_PROMPT = """You are a scientific research assistant and query optimizer.
+# Static instructions first, per-request fields last: the prefix is
+# byte-identical across queries and retries, so Ollama's prompt cache
+# can reuse its KV state instead of re-prefilling it.
+_REWRITER_STATIC_PREFIX = """You are a scientific research assistant and query optimizer.
 Classify the user query and provide search-friendly rewrites.
 
 Categories:
@@ -38,17 +61,27 @@ CRITICAL RULES:
 3. Include both the abbreviation AND its expansion in queries.
 4. For definitions, always include "definition", "means", "refers to" variants.
 5. If the query asks "what is X", also generate "X definition" and "X explained".
-
-Attempt: {attempt} of 3
-{verdict_context}
+6. On attempt 1, also plan the retries: "retry_queries" holds 2 more query lists
+   for attempts 2 and 3, each a genuinely different angle (broader, then more
+   specific, with different synonyms). NEVER repeat a previous query.
 
 Return ONLY valid JSON:
-{{
+{
   "query_type": "simple|multi_hop|math|comparison",
   "strategy": "single|decompose|step_back",
-  "rewritten_queries": ["query 1", "query 2"]
-}}
+  "rewritten_queries": ["query 1", "query 2"],
+  "retry_queries": [["attempt 2 query 1", "attempt 2 query 2"], ["attempt 3 query 1"]]
+}
+
+---
+REQUEST:
+"""
+
+# Persisted keys are salted with the prompt, so editing it retires old rewrites
+_PROMPT_SALT = hashlib.blake2b(_REWRITER_STATIC_PREFIX.encode(), digest_size=16).digest()
 
+_REWRITER_DYNAMIC_SUFFIX = """Attempt: {attempt} of 3
+{verdict_context}
 User query: {query}"""
 
 _RETRY_HINT = """This is a RETRY. Previous verdict: "{last_verdict}".
@@ -59,6 +92,10 @@ You MUST take a genuinely different angle.
 - Try different synonyms and acronym expansions."""
 
 
+_ACRONYM_RE = re.compile(r"\b[A-Z]{2,}\b")
+_JSON_OBJ_RE = re.compile(r"\{[\s\S]*\}")
+
+
 def _pre_expand_acronyms(query: str) -> str:
     """
     Fast rule-based pre-expansion for common patterns BEFORE the LLM call.
@@ -66,20 +103,23 @@ def _pre_expand_acronyms(query: str) -> str:
     This is a lightweight safety net — the LLM does the real expansion.
     """
     # Find all-caps tokens (2+ chars) that look like acronyms
-    acronyms = re.findall(r'\b([A-Z]{2,})\b', query)
+    acronyms = _ACRONYM_RE.findall(query)
     if not acronyms:
         return query
-    # Don't modify the query itself, but append a context hint
-    acr_list = ", ".join(set(acronyms))
+    # Don't modify the query itself, but append a context hint.
+    # First-seen order keeps the prompt stable, so repeats hit the LLM cache.
+    acr_list = ", ".join(dict.fromkeys(acronyms))
     return f"{query} [acronyms to expand: {acr_list}]"
 
 
-def query_rewriter_node(state: L88State) -> dict:
+def _llm_rewrite(state: L88State, current_count: int) -> tuple[dict, bool]:
     """
-    Unified node: Classify query type AND generate rewrites in one call.
-    Reduces latency by saving one sequential LLM call.
+    Ask the LLM to classify and rewrite the query.
+
+    Returns ({query_type, strategy, rewritten_queries}, ok) — ok is False when
+    the call timed out or the response didn't parse, so the result is a
+    fallback that shouldn't be cached.
     """
-    current_count = state.get("rewrite_count", 0)
     last_verdict = state.get("last_verdict", "")
     is_retry = current_count > 0
 
@@ -90,44 +130,113 @@ def query_rewriter_node(state: L88State) -> dict:
     # Pre-expand acronyms before the LLM sees the query
     augmented_query = _pre_expand_acronyms(state["query"])
 
-    prompt = _REWRITER_PROMPT.format(
+    prompt = _REWRITER_STATIC_PREFIX + _REWRITER_DYNAMIC_SUFFIX.format(
         query=augmented_query,
         attempt=current_count + 1,
         verdict_context=verdict_context,
     )
 
-    response = call_llm(prompt, small_ctx=True)
+    fallback = {
+        "query_type": state.get("query_type", "simple"),
+        "strategy": "single",
+        "rewritten_queries": [state["query"]],
+    }
+
+    future = _LLM_POOL.submit(call_llm_cached, prompt, small_ctx=True)
+    try:
+        response = future.result(timeout=REWRITER_TIMEOUT_S)
+    except FutureTimeout:
+        # Too slow — drop the rewrite rather than wait on LLM tail latency.
+        # A running Ollama request can't be interrupted; cancel() only
+        # helps if it hasn't started yet.
+        future.cancel()
+        print(f"[REWRITER] LLM exceeded {REWRITER_TIMEOUT_S}s — using raw query")
+        return fallback, False
     
-    # Parse JSON
+    # Parse JSON — first '{' to last '}' skips any markdown fence or preamble
+    m = _JSON_OBJ_RE.search(response)
     try:
-        # Simple extraction if LLM adds markdown
-        text = response.strip()
-        if "```" in text:
-            text = text.split("```")[1].replace("json", "").strip()
-        
-        result = json.loads(text)
-        query_type = result.get("query_type", "simple")
-        strategy = result.get("strategy", "single")
-        queries = result.get("rewritten_queries", [state["query"]])
-    except:
-        # Fallback — use original query + a simple expansion attempt
-        query_type = state.get("query_type", "simple")
-        strategy = "single"
-        queries = [state["query"]]
+        result = orjson.loads(m.group(0)) if m else None
+    except orjson.JSONDecodeError:
+        result = None
+    if not isinstance(result, dict):
+        # Fallback — use original query
+        return fallback, False
+
+    query_type = result.get("query_type", "simple")
+    strategy = result.get("strategy", "single")
+    queries = result.get("rewritten_queries", [state["query"]])
+    retry_queries = result.get("retry_queries") or []
 
     # Validations
     if query_type not in ("simple", "multi_hop", "math", "comparison"): query_type = "simple"
     if not isinstance(queries, list): queries = [str(queries)]
     queries = [str(q) for q in queries[:3]]
+    plan = [
+        [str(q) for q in qs[:3]]
+        for qs in (retry_queries if isinstance(retry_queries, list) else [])
+        if isinstance(qs, list) and qs
+    ]
 
-    # Always ensure the original raw query is also tried (belt + suspenders)
+    return {
+        "query_type": query_type,
+        "strategy": strategy,
+        "rewritten_queries": queries,
+        "retry_queries": plan[:2],
+    }, True
+
+
+def query_rewriter_node(state: L88State) -> dict:
+    """
+    Unified node: Classify query type AND generate rewrites in one call.
+    Reduces latency by saving one sequential LLM call.
+
+    The first call also plans the retry rewrites (rewrite_plan), so a retry
+    pops its queries from state instead of making another LLM call. First
+    attempts are served from the semantic cache when a near-identical query
+    was rewritten before, then from the on-disk cache of exact queries.
+    Retries without a plan fall back to the LLM.
+    """
+    current_count = state.get("rewrite_count", 0)
     original = state["query"]
+    plan = state.get("rewrite_plan") or []
+
+    cache_key = q_embedding = result = None
+    if current_count == 0:
+        cache_key = " ".join(original.lower().split())
+        q_embedding = embed_texts([original], is_query=True)[0]
+        result = _semantic_cache.get(cache_key, q_embedding)
+        if result is None:
+            disk_key = hashlib.blake2b(cache_key.encode(), digest_size=16, key=_PROMPT_SALT).digest()
+            result = _disk_cache.get(disk_key)
+            if result is not None:
+                _semantic_cache.put(cache_key, q_embedding, result)
+    elif current_count <= len(plan):
+        result = {
+            "query_type": state.get("query_type", "simple"),
+            "strategy": state.get("strategy", "single"),
+            "rewritten_queries": plan[current_count - 1],
+        }
+
+    if result is None:
+        result, ok = _llm_rewrite(state, current_count)
+        if ok and cache_key is not None:
+            _semantic_cache.put(cache_key, q_embedding, result)
+            _disk_cache.put(disk_key, result)
+
+    if current_count == 0:
+        plan = result.get("retry_queries", [])
+
+    queries = list(result["rewritten_queries"])
+
+    # Always ensure the original raw query is also tried (belt + suspenders)
     if original not in queries:
         queries = [original] + queries[:2]
 
     return {
-        "query_type": query_type,
-        "strategy": strategy,
+        "query_type": result["query_type"],
+        "strategy": result["strategy"],
         "rewritten_queries": queries,
         "rewrite_count": current_count + 1,
+        "rewrite_plan": plan,
     }
@@ -5,14 +5,66 @@ Orchestrates: embed queries → FAISS search → dedup → filter by doc IDs →
 """
 
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from l88_backend.graph.state import L88State
-from l88_backend.config import RETRIEVE_TOP_K, RERANK_TOP_N, SESSION_STORAGE, LIBRARY_STORAGE
+from l88_backend.config import (
+    RETRIEVE_TOP_K, RERANK_TOP_N, SESSION_STORAGE, LIBRARY_STORAGE, EVAL_GOOD_SCORE,
+)
 from l88_backend.ingestion.embedder import embed_texts
 from l88_backend.retrieval.vectorstore import VectorStore
 from l88_backend.retrieval.bm25store import BM25Store
 from l88_backend.retrieval.reranker import rerank
 
+# Shared across requests — concurrent chats fan out onto the same workers
+# instead of each spinning up (and tearing down) its own pool.
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retrieval")
+
+
+def _mtime(path: str) -> float:
+    """File mtime, or 0.0 if it doesn't exist yet (empty store)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+# Loaded stores are only searched, never mutated, so one instance can be
+# shared across requests. Keyed by (class, path) with the mtime it was loaded
+# at: a save rewrites the store's files, the next lookup sees a new mtime and
+# the reload replaces the entry, so each path keeps one resident version.
+STORE_CACHE_MAX = 64
+_stores: OrderedDict[tuple[type, str], tuple[float, object]] = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def _load_cached(cls, path: str, mtime: float, **load_kwargs):
+    key = (cls, path)
+    with _stores_lock:
+        hit = _stores.get(key)
+        if hit is not None and hit[0] == mtime:
+            _stores.move_to_end(key)
+            return hit[1]
+    store = cls.load(path, **load_kwargs)   # outside the lock: other paths stay servable
+    with _stores_lock:
+        _stores[key] = (mtime, store)
+        _stores.move_to_end(key)
+        while len(_stores) > STORE_CACHE_MAX:
+            _stores.popitem(last=False)
+    return store
+
+
+def _load_vector_store(path: str, mtime: float) -> VectorStore:
+    return _load_cached(VectorStore, path, mtime, mmap=True)
+
+
+def _load_bm25_store(path: str, mtime: float) -> BM25Store:
+    return _load_cached(BM25Store, path, mtime)
+
 
 def _normalize_scores(chunks: list[dict], score_key: str) -> list[dict]:
     """
@@ -30,18 +82,76 @@ def _normalize_scores(chunks: list[dict], score_key: str) -> list[dict]:
     return chunks
 
 
+def _keyed(chunks: list[dict]) -> list[tuple[tuple, dict]]:
+    """Pair each chunk with its (doc_id, chunk_idx) dedup key."""
+    return [((c.get("doc_id", ""), c.get("chunk_idx", 0)), c) for c in chunks]
+
+
+def _blend(
+    faiss_raw: list[dict],
+    bm25_raw: list[dict],
+    vector_weight: float,
+    bm25_weight: float,
+) -> list[tuple[tuple, dict]]:
+    """
+    Blend one query's FAISS and BM25 hits into a single scored list.
+
+    Returns (dedup_key, chunk) pairs; dedup across queries is left to the
+    caller so results merge in query order regardless of completion order.
+    """
+    hits = []
+
+    faiss_results = dict(_keyed(faiss_raw))
+    bm25_results = dict(_keyed(_normalize_scores(bm25_raw, "bm25_score")))
+
+    # Blend scores (both are now in [0,1] range)
+    all_keys = set(faiss_results) | set(bm25_results)
+    
+    # Adaptive weighting
+    current_vector_weight = vector_weight
+    current_bm25_weight = bm25_weight
+    
+    if not faiss_results and bm25_results:
+        current_vector_weight, current_bm25_weight = 0.0, 1.0
+    elif faiss_results and not bm25_results:
+        current_vector_weight, current_bm25_weight = 1.0, 0.0
+
+    # One vector op for the blend; missing side scores 0
+    keys = list(all_keys)
+    n = len(keys)
+    v = np.fromiter(
+        (faiss_results[k]["score"] if k in faiss_results else 0.0 for k in keys),
+        dtype=np.float32, count=n,
+    )
+    b = np.fromiter(
+        (bm25_results[k]["bm25_score"] if k in bm25_results else 0.0 for k in keys),
+        dtype=np.float32, count=n,
+    )
+    blended = current_vector_weight * v + current_bm25_weight * b
+
+    for key, score in zip(keys, blended.tolist()):
+        chunk = dict(faiss_results.get(key) or bm25_results[key])
+        chunk["score"] = score
+        hits.append((key, chunk))
+
+    return hits
+
+
 def retrieval_node(state: L88State) -> dict:
     """
     Retrieve and rerank chunks for the rewritten queries.
 
     Steps:
-      1. Embed each rewritten query with BGE prefix
+      1. Embed all rewritten queries with BGE prefix (one batch)
       2. FAISS search → top-K per query
-      3. Union → deduplicate by chunk_idx + doc_id
-      4. Filter by selected_doc_ids
-      5. If web_mode: also search library FAISS
-      6. BGE reranker → top-N
-      7. found = len(chunks) > 0
+      3. Union → deduplicate by chunk_idx + doc_id, filtering by
+         selected_doc_ids in the same pass
+      4. If web_mode: also search library FAISS
+      5. BGE reranker → top-N
+      6. found = len(chunks) > 0
+
+    FAISS searches all queries in one batched call while per-query BM25
+    tasks run on a shared pool — both spend most of their time outside the GIL.
     """
     queries = state.get("rewritten_queries") or [state["query"]]
     selected_doc_ids = state.get("selected_doc_ids", [])
@@ -49,12 +159,16 @@ def retrieval_node(state: L88State) -> dict:
     web_mode = state.get("web_mode", False)
 
     all_chunks = []
-    seen = set()
+    seen: set[tuple] = set()
 
     # Load session FAISS + BM25 indexes
     session_index_path = os.path.join(SESSION_STORAGE, session_id, "index")
-    session_store = VectorStore.load(session_index_path)
-    bm25_store = BM25Store.load(session_index_path)
+    session_store = _load_vector_store(
+        session_index_path, _mtime(os.path.join(session_index_path, "index.faiss"))
+    )
+    bm25_store = _load_bm25_store(
+        session_index_path, _mtime(os.path.join(session_index_path, "bm25_chunks.json"))
+    )
 
     # Blend ratio by query type — more BM25 for exact match, more vector for conceptual
     query_type = state.get("query_type", "simple")
@@ -65,75 +179,52 @@ def retrieval_node(state: L88State) -> dict:
     library_store = None
     if web_mode:
         library_index_path = os.path.join(LIBRARY_STORAGE, "index")
-        if os.path.exists(os.path.join(library_index_path, "index.faiss")):
-            library_store = VectorStore.load(library_index_path)
-
-    # Embed and search for each query
-    for q in queries:
-        q_embedding = embed_texts([q], is_query=True)
-
-        if web_mode:
-            # EXCLUSIVE WEB MODE: Search Library FAISS Only
-            if library_store and library_store.count > 0:
-                lib_results = library_store.search(q_embedding[0], top_k=RETRIEVE_TOP_K)
-                for chunk in lib_results:
-                    key = (chunk.get("doc_id", ""), chunk.get("chunk_idx", 0))
-                    if key not in seen:
-                        seen.add(key)
-                        all_chunks.append(chunk)
+        library_mtime = _mtime(os.path.join(library_index_path, "index.faiss"))
+        if library_mtime:
+            library_store = _load_vector_store(library_index_path, library_mtime)
+
+    # Embed all queries in one batch. FAISS gets every query in a single
+    # search_batch call (it threads across queries internally); each BM25
+    # query is its own pool task, running alongside. Only leaf searches go
+    # to the pool — blending runs here, so workers never wait on each other.
+    q_embeddings = embed_texts(queries, is_query=True)
+    submit = _RETRIEVAL_POOL.submit
+    if web_mode:
+        # EXCLUSIVE WEB MODE: Search Library FAISS Only
+        if library_store and library_store.count > 0:
+            per_query = [
+                _keyed(hits) for hits in library_store.search_batch(q_embeddings, RETRIEVE_TOP_K)
+            ]
         else:
-            # SESSION MODE: Session FAISS + BM25
-            faiss_results = {}
-            if session_store.count > 0:
-                results = session_store.search(q_embedding[0], top_k=RETRIEVE_TOP_K)
-                for chunk in results:
-                    key = (chunk.get("doc_id", ""), chunk.get("chunk_idx", 0))
-                    faiss_results[key] = chunk
-
-            bm25_results = {}
-            if bm25_store.count > 0:
-                raw_bm25 = bm25_store.search(q, top_k=RETRIEVE_TOP_K)
-                normalized_bm25 = _normalize_scores(raw_bm25, "bm25_score")
-                for chunk in normalized_bm25:
-                    key = (chunk.get("doc_id", ""), chunk.get("chunk_idx", 0))
-                    bm25_results[key] = chunk
-
-            # Blend scores (both are now in [0,1] range)
-            all_keys = set(faiss_results) | set(bm25_results)
-            
-            # Adaptive weighting
-            current_vector_weight = vector_weight
-            current_bm25_weight = bm25_weight
-            
-            if not faiss_results and bm25_results:
-                current_vector_weight, current_bm25_weight = 0.0, 1.0
-            elif faiss_results and not bm25_results:
-                current_vector_weight, current_bm25_weight = 1.0, 0.0
-
-            for key in all_keys:
-                if key in seen:
-                    continue
-                seen.add(key)
-
-                faiss_chunk = faiss_results.get(key)
-                bm25_chunk = bm25_results.get(key)
-
-                chunk = dict(faiss_chunk or bm25_chunk)
-                faiss_score = faiss_chunk.get("score", 0.0) if faiss_chunk else 0.0
-                bm25_score = bm25_chunk.get("bm25_score", 0.0) if bm25_chunk else 0.0
-
-                chunk["score"] = (current_vector_weight * faiss_score) + (current_bm25_weight * bm25_score)
-                all_chunks.append(chunk)
-
-    # Filter by selected doc IDs (session docs only — library docs always included)
-    if selected_doc_ids:
-        filtered = []
-        for chunk in all_chunks:
-            doc_id = chunk.get("doc_id", "")
-            source = chunk.get("source", "session")
-            if source == "library" or doc_id in selected_doc_ids:
-                filtered.append(chunk)
-        all_chunks = filtered
+            per_query = []
+    else:
+        # SESSION MODE: Session FAISS + BM25
+        bm25_futs = [
+            submit(bm25_store.search, q, RETRIEVE_TOP_K) if bm25_store.count > 0 else None
+            for q in queries
+        ]
+        vec_hits = (
+            session_store.search_batch(q_embeddings, RETRIEVE_TOP_K)
+            if session_store.count > 0 else [[] for _ in queries]
+        )
+        per_query = [
+            _blend(fv, fb.result() if fb else [], vector_weight, bm25_weight)
+            for fv, fb in zip(vec_hits, bm25_futs)
+        ]
+
+    # Merge in query order: dedup + selected-doc filter in one pass
+    # (session docs only — library docs always included)
+    selected_set = set(selected_doc_ids)
+    for hits in per_query:
+        for key, chunk in hits:
+            if key in seen:
+                continue
+            seen.add(key)
+            doc_id = key[0]
+            if (selected_set and doc_id not in selected_set
+                    and chunk.get("source", "session") != "library"):
+                continue
+            all_chunks.append(chunk)
 
     # Capture "initial" state for debugging
     initial_chunks = [dict(c) for c in all_chunks[:20]] # Limit to 20 for DB size
@@ -144,7 +235,7 @@ def retrieval_node(state: L88State) -> dict:
     if all_chunks:
         original_query = state["query"]
         all_chunks, top_score = rerank(original_query, all_chunks, top_n=RERANK_TOP_N)
-        confident = top_score >= 0.7
+        confident = top_score >= EVAL_GOOD_SCORE
 
     # Capture "final" state
     finalists = [dict(c) for c in all_chunks]
@@ -8,20 +8,21 @@ Determines the route based on selected_doc_ids and web_mode:
   0 docs + web OFF                  → "chat"  (LLM answers from trained knowledge)
 """
 
+import re
+
 from l88_backend.graph.state import L88State
 
-_SUMMARIZE_KEYWORDS = {
-    "summarize", "summary", "summarise", "overview",
-    "tldr", "tl;dr", "tl-dr", "brief", "outline", "recap",
-    "summerize", "summerise"
-}
+# summarize/summarise/summerize/summerise, summary, tl;dr/tldr/tl-dr, ...
+# No trailing \b, so "briefly" / "outlines" still match as before.
+_SUMMARIZE_RE = re.compile(
+    r"\b(?:summ[ae]ri[sz]e|summary|overview|tl[;:-]?dr|brief|outline|recap)",
+    re.IGNORECASE,
+)
 
 def router_node(state: L88State) -> dict:
     """Classify the request route without calling the LLM."""
     has_docs = bool(state.get("selected_doc_ids"))
-    query_lower = state["query"].lower()
-
-    is_summarize = any(kw in query_lower for kw in _SUMMARIZE_KEYWORDS)
+    is_summarize = _SUMMARIZE_RE.search(state["query"]) is not None
     web_mode = state.get("web_mode", False)
 
     # ── Logic ──────────────────────────────────────────────
@@ -34,6 +35,8 @@ def router_node(state: L88State) -> dict:
     elif has_docs:
         route = "rag"
     else:
-        route = "chat"
+        # chat edges straight to the generator — the rewriter never runs,
+        # so fill in the identity rewrite it would otherwise own
+        return {"route": "chat", "rewritten_queries": [state["query"]]}
 
     return {"route": route}
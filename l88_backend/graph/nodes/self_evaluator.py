@@ -2,11 +2,12 @@
 Self-Evaluator node — uses cross-encoder confidence score from retrieval.
 
 Replaces LLM-as-judge with the rerank_score already computed in retrieval.
-Threshold: >= 0.7 → GOOD, >= 0.4 → UNSURE, < 0.4 → BAD.
-No additional LLM call needed.
+Threshold: >= EVAL_GOOD_SCORE (0.7) → GOOD, >= EVAL_UNSURE_SCORE (0.4) → UNSURE,
+else BAD. No additional LLM call needed.
 """
 
 from l88_backend.graph.state import L88State
+from l88_backend.config import EVAL_GOOD_SCORE, EVAL_UNSURE_SCORE
 
 
 def self_evaluator_node(state: L88State) -> dict:
@@ -25,9 +26,9 @@ def self_evaluator_node(state: L88State) -> dict:
 
     top_score = chunks[0].get("rerank_score", 0.0)
 
-    if top_score >= 0.7:
+    if top_score >= EVAL_GOOD_SCORE:
         verdict = "GOOD"
-    elif top_score >= 0.4:
+    elif top_score >= EVAL_UNSURE_SCORE:
         verdict = "UNSURE"
     else:
         verdict = "BAD"
@@ -1,50 +1,96 @@
 """
 Summarizer node — full document summarization, bypasses retrieval.
 
-Loads raw text directly from stored chunks for selected docs,
-sends full context to LLM. No retrieval, no reranking.
+Loads raw text directly from stored chunks for selected docs.
+No retrieval, no reranking.
+
+Map-reduce instead of one truncated prompt: chunks are grouped into
+sections of SUMMARY_SECTION_CHUNKS, each section is summarized in parallel,
+and the partial summaries are fused (recursively, if there are many) into
+the final answer. Every call shares the same system prompt, so Ollama can
+reuse its KV prefix across map and reduce steps.
 """
 
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 
 from l88_backend.graph.state import L88State
 from l88_backend.llm.client import call_llm
-from l88_backend.config import SESSION_STORAGE
+from l88_backend.retrieval.vectorstore import VectorStore
+from l88_backend.config import SESSION_STORAGE, SUMMARY_SECTION_CHUNKS, SUMMARY_MAX_WORKERS
 
-_SUMMARIZE_PROMPT = """You are a research assistant. Summarize the following document clearly and concisely.
+_SUMMARY_POOL = ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS, thread_name_prefix="summarize")
 
-User request: {query}
+_SUMMARY_SYSTEM = """You are a research assistant. Summarize documents clearly and concisely.
+Cover the main points, methodology (if any), and key findings or conclusions."""
 
-Document content:
+_SINGLE_PROMPT = """User request: {query}
+
+Document text:
+{content}
+
+Write one well-structured summary of the whole document."""
+
+_MAP_PROMPT = """User request: {query}
+
+Document section:
+{content}
+
+Summarize this section. Keep concrete facts, numbers, and named methods."""
+
+_REDUCE_PROMPT = """User request: {query}
+
+Section summaries, in document order:
 {content}
 
-Write a well-structured summary covering the main points, methodology (if any), and key findings or conclusions."""
+Combine these into one well-structured summary of the whole document."""
+
+
+def _groups(items: list[str]) -> list[str]:
+    """Join consecutive items into sections of SUMMARY_SECTION_CHUNKS."""
+    return [
+        "\n\n".join(items[i:i + SUMMARY_SECTION_CHUNKS])
+        for i in range(0, len(items), SUMMARY_SECTION_CHUNKS)
+    ]
+
+
+def _summarize(query: str, texts: list[str]) -> str:
+    """Map each section, then reduce until one summary is left."""
+    sections = _groups(texts)
+    if len(sections) == 1:
+        # Fits in one call — summarize the raw text directly, no map/reduce
+        return call_llm(_SINGLE_PROMPT.format(query=query, content=sections[0]), system=_SUMMARY_SYSTEM)
+
+    partials = list(_SUMMARY_POOL.map(
+        lambda s: call_llm(_MAP_PROMPT.format(query=query, content=s), system=_SUMMARY_SYSTEM),
+        sections,
+    ))
+
+    # Reduce in groups so the fused prompt never outgrows the context window
+    while len(partials) > 1:
+        partials = list(_SUMMARY_POOL.map(
+            lambda s: call_llm(_REDUCE_PROMPT.format(query=query, content=s), system=_SUMMARY_SYSTEM),
+            _groups(partials),
+        ))
+    return partials[0]
 
 
 def summarizer_node(state: L88State) -> dict:
-    """Load full document text and summarize directly, bypassing retrieval."""
+    """Load full document text and summarize via map-reduce, bypassing retrieval."""
     session_id = state["session_id"]
     selected_doc_ids = state.get("selected_doc_ids", [])
 
     # Load chunks from disk for selected docs
-    metadata_path = os.path.join(SESSION_STORAGE, session_id, "index", "metadata.json")
-    all_text = ""
-
-    try:
-        with open(metadata_path, "r") as f:
-            all_chunks = json.load(f)
+    index_dir = os.path.join(SESSION_STORAGE, session_id, "index")
+    all_chunks = VectorStore.load_metadata(index_dir)
 
-        doc_chunks = [
-            c for c in all_chunks
-            if c.get("doc_id") in selected_doc_ids
-        ]
+    selected = set(selected_doc_ids)
+    texts = [
+        c["text"] for c in all_chunks
+        if c.get("doc_id") in selected and c.get("text", "").strip()
+    ]
 
-        all_text = "\n\n".join(c.get("text", "") for c in doc_chunks)
-    except (FileNotFoundError, json.JSONDecodeError):
-        all_text = ""
-
-    if not all_text.strip():
+    if not texts:
         return {
             "answer": "Could not load document content for summarization.",
             "confident": False,
@@ -54,12 +100,7 @@ def summarizer_node(state: L88State) -> dict:
             "missing_info": "",
         }
 
-    prompt = _SUMMARIZE_PROMPT.format(
-        query=state["query"],
-        content=all_text[:12000],  # cap to stay within context window
-    )
-
-    answer = call_llm(prompt)
+    answer = _summarize(state["query"], texts)
 
     return {
         "answer": answer,
@@ -68,4 +109,4 @@ def summarizer_node(state: L88State) -> dict:
         "sources": [],
         "reasoning": "",
         "missing_info": "",
-    }
\ No newline at end of file
+    }
@@ -28,6 +28,7 @@ class L88State(TypedDict):
     rewritten_queries: list[str]
     rewrite_count: int              # max 2 — incremented by query_rewriter
     last_verdict: str               # written by generator + self_evaluator
+    rewrite_plan: list[list[str]]   # retry rewrites planned on attempt 1, one list per retry
 
     # ── Retrieval ────────────────────────────────────────────────
     chunks: list[dict]              # {text, doc_id, filename, page, chunk_idx, score}
@@ -0,0 +1,90 @@
+"""
+Embedding micro-batch queue — coalesces passage embeds from concurrent ingests.
+
+Each upload embeds only its own chunks; several uploads at once would each
+run their own small encode. submit_many() queues a request instead, and one
+worker thread drains whatever arrives within EMBED_QUEUE_WAIT_MS (up to
+EMBED_QUEUE_MAX_ITEMS texts), embeds it in a single embed_texts call and
+hands each caller back its own rows. A request that alone reaches the limit
+is embedded without waiting.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from l88_backend.config import EMBED_QUEUE_MAX_ITEMS, EMBED_QUEUE_WAIT_MS
+from l88_backend.ingestion.embedder import embed_texts
+
+
+class _Request(NamedTuple):
+    texts: list[str]
+    future: Future
+
+
+_queue: "queue.SimpleQueue[_Request]" = queue.SimpleQueue()
+_worker: threading.Thread | None = None
+_worker_lock = threading.Lock()
+
+
+def _drain() -> list[_Request]:
+    """Block for one request, then gather more until the window or size limit."""
+    batch = [_queue.get()]
+    n_texts = len(batch[0].texts)
+    deadline = time.monotonic() + EMBED_QUEUE_WAIT_MS / 1000
+    while n_texts < EMBED_QUEUE_MAX_ITEMS:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            req = _queue.get(timeout=timeout)
+        except queue.Empty:
+            break
+        batch.append(req)
+        n_texts += len(req.texts)
+    return batch
+
+
+def _run() -> None:
+    while True:
+        batch = _drain()
+        try:
+            embeddings = embed_texts([t for req in batch for t in req.texts])
+        except Exception as exc:
+            for req in batch:
+                req.future.set_exception(exc)
+            continue
+        start = 0
+        for req in batch:
+            end = start + len(req.texts)
+            req.future.set_result(embeddings[start:end])   # row slice: still C-contiguous
+            start = end
+
+
+def _ensure_worker() -> None:
+    global _worker
+    if _worker is not None:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="embed-queue", daemon=True)
+            _worker.start()
+
+
+def submit_many(texts: list[str]) -> Future:
+    """
+    Queue passage texts for embedding.
+
+    Returns:
+        Future resolving to np.ndarray of shape (len(texts), embed_dim),
+        as embed_texts(texts) would return.
+    """
+    future: Future = Future()
+    if not texts:
+        future.set_result(embed_texts([]))
+        return future
+    _ensure_worker()
+    _queue.put(_Request(list(texts), future))
+    return future
@@ -1,26 +1,272 @@
 """
-Embedder — BAAI/bge-base-en-v1.5 on CPU.
+Embedder — BAAI/bge-base-en-v1.5 on CUDA / MPS when available, else CPU
+(override with L88_EMBED_DEVICE).
 
 Singleton model loader. L2-normalizes vectors for cosine similarity via FAISS IP.
 Prepends the BGE query prefix for retrieval queries.
+
+Query embeddings are memoized in an LRU keyed by case/whitespace-normalized
+text (the BGE tokenizer is uncased), and WARM_QUERIES are embedded at startup —
+repeat and common queries skip the model entirely. Passage embeddings are
+persisted in the disk cache keyed by a BLAKE2b hash of the chunk text, so
+re-uploads and documents sharing sections only encode the new chunks.
+
+Texts are sorted by length before batching so each mini-batch pads only to
+its own longest member, then returned in input order.
+
+Torch weights load in half precision where the hardware runs it natively —
+bf16 on GPUs / CPUs with bf16 units, fp16 on other GPUs, fp32 otherwise
+(override with L88_EMBED_DTYPE). Output is always float32 and unit-length,
+normalized once here, so neither ingest nor search normalizes again.
+
+EMBED_BACKEND="onnx" swaps sentence-transformers for an ONNX Runtime export
+(O2 graph fusions, optional int8) — needs `pip install optimum[onnxruntime]`.
+The graph is exported once into MODEL_STORAGE and reused on later starts.
 """
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
-from l88_backend.config import EMBED_MODEL, EMBED_PREFIX
+from l88_backend.config import (
+    EMBED_MODEL, EMBED_PREFIX, EMBED_DEVICE, EMBED_BATCH_SIZE, TORCH_NUM_THREADS,
+    EMBED_BACKEND, EMBED_DTYPE, EMBED_ONNX_QUANTIZE, MODEL_STORAGE,
+    QUERY_EMBED_CACHE_MAX, EMBED_DISK_TTL_S, WARM_QUERIES,
+)
+from l88_backend.disk_cache import DiskCache
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+    from transformers import AutoTokenizer
+    _ONNX_AVAILABLE = True
+except ImportError:
+    _ONNX_AVAILABLE = False
+
+# Explicit thread pools; default detection can pin to one core on some VMs
+torch.set_num_threads(TORCH_NUM_THREADS)
+try:
+    torch.set_num_interop_threads(1)    # only allowed before any inter-op work
+except RuntimeError:
+    pass
+
+_model = None   # SentenceTransformer | _OnnxEncoder
+_model_lock = threading.Lock()
+
+
+class _OnnxEncoder:
+    """
+    ONNX Runtime BGE encoder exposing the slice of the SentenceTransformer
+    API used here (encode, get_sentence_embedding_dimension).
+
+    CLS pooling + L2 norm, as BGE was trained — same vectors as the torch path
+    (up to float error, or int8 error when quantized), so existing indexes stay valid.
+    """
+
+    def __init__(self, model_dir: str, file_name: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir, file_name=file_name)
+        self.dim = self.model.config.hidden_size
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts: list[str], batch_size: int = 32,
+               normalize_embeddings: bool = True, **_) -> np.ndarray:
+        out = []
+        for i in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                texts[i:i + batch_size], padding=True, truncation=True,
+                max_length=512, return_tensors="np",
+            )
+            hidden = self.model(**enc).last_hidden_state
+            out.append(np.asarray(hidden[:, 0], dtype=np.float32))
+        emb = np.concatenate(out) if out else np.zeros((0, self.dim), dtype=np.float32)
+        if normalize_embeddings:
+            emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+        return emb
+
+
+def _load_onnx() -> _OnnxEncoder:
+    """Export → optimize (O2) → optionally quantize once; load from disk after."""
+    base = os.path.join(MODEL_STORAGE, EMBED_MODEL.replace("/", "__") + "-onnx")
+    file_name = "model_quantized.onnx" if EMBED_ONNX_QUANTIZE else "model_optimized.onnx"
+    if not os.path.exists(os.path.join(base, file_name)):
+        print(f"[EMBEDDER] Exporting {EMBED_MODEL} to ONNX in {base}")
+        model = ORTModelForFeatureExtraction.from_pretrained(EMBED_MODEL, export=True)
+        AutoTokenizer.from_pretrained(EMBED_MODEL).save_pretrained(base)
+        ORTOptimizer.from_pretrained(model).optimize(
+            save_dir=base, optimization_config=OptimizationConfig(optimization_level=2),
+        )
+        if EMBED_ONNX_QUANTIZE:
+            quantizer = ORTQuantizer.from_pretrained(base, file_name="model_optimized.onnx")
+            quantizer.quantize(
+                save_dir=base,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False),
+            )
+    return _OnnxEncoder(base, file_name)
 
-_model: SentenceTransformer | None = None
 
+def _detect_device() -> str:
+    """L88_EMBED_DEVICE if set, else the fastest available torch device."""
+    if EMBED_DEVICE:
+        return EMBED_DEVICE
+    try:
+        if torch.cuda.is_available():
+            return "cuda"
+        if torch.backends.mps.is_available():
+            return "mps"
+    except Exception:
+        pass
+    return "cpu"
 
-def _get_model() -> SentenceTransformer:
-    """Lazy-load the embedding model (CPU)."""
+
+def _cpu_has_bf16() -> bool:
+    """True if the CPU advertises native bf16 (AVX512-BF16 / AMX). Linux only."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def _pick_dtype(device: str) -> torch.dtype:
+    """L88_EMBED_DTYPE if set, else the narrowest dtype the device computes natively."""
+    if EMBED_DTYPE != "auto":
+        return getattr(torch, EMBED_DTYPE)
+    if device.startswith("cuda"):
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    if device == "mps":
+        return torch.float16
+    # Emulated bf16 on older CPUs is slower than fp32
+    return torch.bfloat16 if _cpu_has_bf16() else torch.float32
+
+
+def _get_model():
+    """Lazy-load the embedding model (ONNX if configured, else on the detected device)."""
     global _model
-    if _model is None:
-        _model = SentenceTransformer(EMBED_MODEL, device="cpu")
+    if _model is not None:
+        return _model
+    # Double-checked: startup warm-up and early requests can race here
+    with _model_lock:
+        if _model is None:
+            if EMBED_BACKEND == "onnx" and _ONNX_AVAILABLE:
+                _model = _load_onnx()
+            else:
+                if EMBED_BACKEND == "onnx":
+                    print("[EMBEDDER] optimum[onnxruntime] not installed — using sentence-transformers")
+                device = _detect_device()
+                dtype = _pick_dtype(device)
+                print(f"[EMBEDDER] Loading {EMBED_MODEL} on {device} ({dtype})")
+                _model = SentenceTransformer(
+                    EMBED_MODEL, device=device, model_kwargs={"torch_dtype": dtype},
+                )
     return _model
 
 
+def _encode(texts: list[str]) -> np.ndarray:
+    """Length-sorted batched encode; rows come back in input order."""
+    model = _get_model()
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    emb = model.encode(
+        [texts[i] for i in order],
+        batch_size=EMBED_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    emb = np.asarray(emb, dtype=np.float32)   # half-precision models → FAISS float32
+    out = np.empty_like(emb)
+    out[order] = emb
+    # Re-normalize in float32: a bf16/fp16 model normalized at ~3 significant
+    # digits, and IndexFlatIP scores are only cosines for exactly unit vectors
+    out /= np.linalg.norm(out, axis=1, keepdims=True)
+    return out
+
+
+_query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+_query_lock = threading.Lock()
+
+
+def _norm_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _embed_queries(texts: list[str]) -> np.ndarray:
+    """Query embeddings via the LRU; only cache misses reach the model."""
+    if not texts:
+        return np.zeros((0, _get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+
+    keys = [_norm_query(t) for t in texts]
+    found: dict[str, np.ndarray] = {}
+    with _query_lock:
+        for k in keys:
+            vec = _query_cache.get(k)
+            if vec is not None:
+                _query_cache.move_to_end(k)
+                found[k] = vec
+
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    if missing:
+        encoded = _encode([EMBED_PREFIX + k for k in missing])
+        with _query_lock:
+            for k, vec in zip(missing, np.asarray(encoded, dtype=np.float32)):
+                vec.flags.writeable = False     # shared across callers
+                found[k] = _query_cache[k] = vec
+            while len(_query_cache) > QUERY_EMBED_CACHE_MAX:
+                _query_cache.popitem(last=False)
+
+    return np.stack([found[k] for k in keys])
+
+
+# Namespaced by model: a different checkpoint yields incompatible vectors
+_passage_cache = DiskCache(f"embed:{EMBED_MODEL}", ttl_seconds=EMBED_DISK_TTL_S)
+
+
+def _embed_passages(texts: list[str]) -> np.ndarray:
+    """Passage embeddings via the disk cache; only unseen texts reach the model."""
+    if not texts:
+        return np.zeros((0, _get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+
+    keys = [hashlib.blake2b(t.encode(), digest_size=16).digest() for t in texts]
+    found = _passage_cache.get_blobs(keys)
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    if missing:
+        hits = sum(k in found for k in keys)
+        by_key = dict(zip(keys, texts))
+        encoded = _encode([by_key[k] for k in missing])
+        for k, vec in zip(missing, encoded):
+            blob = vec.tobytes()
+            found[k] = blob
+            _passage_cache.put_blob(k, blob)
+        print(f"[EMBEDDER] {hits}/{len(texts)} chunk embeddings from cache")
+        if len(missing) == len(keys):
+            return encoded      # all new and distinct: already in input order
+
+    # Fill one writable float32 buffer straight from the stored bytes
+    first = np.frombuffer(found[keys[0]], dtype=np.float32)
+    out = np.empty((len(keys), first.shape[0]), dtype=np.float32)
+    for row, k in zip(out, keys):
+        row[:] = np.frombuffer(found[k], dtype=np.float32)
+    return out
+
+
+def warm_up() -> None:
+    """Load the model and run one passage encode so allocator / kernel caches are hot."""
+    _encode(["warmup"])
+
+
+def warm_query_cache() -> None:
+    """Load the model and embed WARM_QUERIES. Safe to run in a background thread."""
+    _embed_queries(WARM_QUERIES)
+
+
 def embed_texts(texts: list[str], is_query: bool = False) -> np.ndarray:
     """
     Embed a list of texts.
@@ -32,10 +278,9 @@ def embed_texts(texts: list[str], is_query: bool = False) -> np.ndarray:
     Returns:
         np.ndarray of shape (len(texts), embed_dim), L2-normalized.
     """
-    model = _get_model()
-
     if is_query:
-        texts = [EMBED_PREFIX + t for t in texts]
+        return _embed_queries(texts)
 
-    embeddings = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
-    return np.array(embeddings, dtype=np.float32)
+    # FAISS wants float32, C-contiguous rows. _embed_passages already returns
+    # that layout, so this is a no-op pass-through (no copy) in practice.
+    return np.ascontiguousarray(_embed_passages(texts), dtype=np.float32)
@@ -7,20 +7,32 @@ Strategy (per page):
      (renders page to grayscale image, runs OCR at 300 DPI)
   3. Cross-page header/footer stripping applied after all pages are gathered
 
+OCR pages are rendered sequentially (MuPDF documents aren't thread-safe),
+then recognized concurrently — each pytesseract call is its own tesseract
+subprocess, so a thread pool of OCR_CONCURRENCY runs them in parallel.
+
+Native text extraction for long PDFs (>= PARALLEL_MIN_PAGES) is sharded
+across a process pool; each worker opens its own fitz.Document.
+
 Dependencies:
   - pymupdf   : pip install pymupdf
   - pytesseract + pillow: pip install pytesseract pillow
   - tesseract  : conda install -c conda-forge tesseract
 """
 
+import multiprocessing
+import os
 import re
+import threading
 import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import fitz  # PyMuPDF
 
 try:
     import pytesseract
     from PIL import Image
-    import io
     _TESSERACT_AVAILABLE = True
 except ImportError:
     _TESSERACT_AVAILABLE = False
@@ -37,6 +49,14 @@ except ImportError:
 # Pages with fewer extractable characters than this will trigger OCR.
 OCR_MIN_CHARS = 50
 
+# Concurrent tesseract processes per PDF.
+OCR_CONCURRENCY = os.cpu_count() or 1
+
+# Text extraction fans out to processes only when the PDF is long enough
+# to amortize the IPC of returning page text.
+PARALLEL_MIN_PAGES = 32
+EXTRACT_WORKERS = min(os.cpu_count() or 1, 4)
+
 
 # ── Noise-line detection ─────────────────────────────────────────────────────
 
@@ -47,62 +67,157 @@ _PAGE_NUM_RE = re.compile(
 
 _WHITESPACE_RE = re.compile(r'\n{3,}', re.MULTILINE)
 
+# _PAGE_NUM_RE's alternatives for use inside a whole-page pattern: same
+# shapes, but whitespace can't cross a newline and only this part ignores case.
+_H = r'[^\S\n]'   # horizontal whitespace
+_PAGE_NUM_BODY = (
+    rf'(?i:page{_H}+\d+{_H}*(?:of{_H}+\d+)?|\d+{_H}+of{_H}+\d+|[-–]{_H}*\d+{_H}*[-–]|\d+)'
+)
+_BLANK_LINE_RE = re.compile(rf'^{_H}+$', re.MULTILINE)
+
+# Above this many noise lines the alternation costs more to compile than it saves.
+NOISE_ALTERNATION_MAX = 5000
+
 
 def _detect_repeating_lines(all_pages: list[str], threshold: int = 2) -> set[str]:
     """Lines appearing on >= threshold distinct pages — likely headers/footers."""
-    from collections import Counter
     line_page_count: Counter = Counter()
     for page_text in all_pages:
-        unique_lines = {
-            ln.strip() for ln in page_text.splitlines()
-            if ln.strip() and len(ln.strip()) < 120
-        }
-        for ln in unique_lines:
-            line_page_count[ln] += 1
+        # Set per page → each line counts once per page; update() increments in C
+        line_page_count.update({
+            s for ln in page_text.split("\n")
+            if (s := ln.strip()) and len(s) < 120
+        })
     return {ln for ln, cnt in line_page_count.items() if cnt >= threshold}
 
 
-def _clean_page(text: str, noise_lines: set[str]) -> str:
+def _noise_regex(noise_lines: set[str]) -> re.Pattern | None:
+    """
+    One per-document pattern matching a whole noise or page-number line
+    (including its newline), or None when there are too many noise lines.
+    """
+    if len(noise_lines) > NOISE_ALTERNATION_MAX:
+        return None
+    alts = [re.escape(ln) for ln in sorted(noise_lines, key=len, reverse=True)]
+    alts.append(_PAGE_NUM_BODY)
+    return re.compile(rf'^{_H}*(?:' + "|".join(alts) + rf'){_H}*(?:\n|\Z)', re.MULTILINE)
+
+
+def _clean_page(text: str, noise_lines: set[str], noise_re: re.Pattern | None = None) -> str:
     """Strip noise lines, bare page numbers, and collapse blank lines."""
-    lines = text.splitlines()
-    cleaned = []
-    for ln in lines:
-        stripped = ln.strip()
-        if not stripped:
-            cleaned.append("")
-            continue
-        if stripped in noise_lines:
-            continue
-        if _PAGE_NUM_RE.match(stripped):
-            continue
-        cleaned.append(ln)
-    result = "\n".join(cleaned)
+    if noise_re is not None:
+        # Whole page in two C-level passes: drop noise lines, blank out
+        # whitespace-only lines
+        result = _BLANK_LINE_RE.sub("", noise_re.sub("", text))
+    else:
+        cleaned = []
+        for ln in text.split("\n"):
+            stripped = ln.strip()
+            if not stripped:
+                cleaned.append("")
+                continue
+            if stripped in noise_lines:
+                continue
+            if _PAGE_NUM_RE.match(stripped):
+                continue
+            cleaned.append(ln)
+        result = "\n".join(cleaned)
     result = _WHITESPACE_RE.sub("\n\n", result)
     return result.strip()
 
 
 # ── OCR helper ───────────────────────────────────────────────────────────────
 
-def _ocr_page(page: fitz.Page) -> str:
+def _render_page(page: fitz.Page) -> "Image.Image | None":
+    """Render the page to a grayscale PIL image for OCR (main thread only)."""
+    try:
+        # 2× scale factor → better OCR accuracy on small text
+        mat = fitz.Matrix(2, 2)
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+        # Raw samples straight into PIL — no PNG encode/decode round-trip
+        return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    except Exception as exc:
+        print(f"[PARSER] Render failed on page {page.number + 1}: {exc}")
+        return None
+
+
+def _ocr_image(img: "Image.Image | None", page_num: int) -> str:
     """
-    Render the page to a grayscale image and run Tesseract OCR via pytesseract.
-    Returns empty string if unavailable or on failure.
+    Run Tesseract OCR via pytesseract on a rendered page. Thread-safe.
+    Returns empty string on failure.
     """
-    if not _TESSERACT_AVAILABLE:
+    if img is None:
         return ""
     try:
-        # 2× scale factor → better OCR accuracy on small text
-        mat = fitz.Matrix(2, 2)
-        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY)
-        img_bytes = pix.tobytes("png")
-        img = Image.open(io.BytesIO(img_bytes))
-        text = pytesseract.image_to_string(img, lang="eng")
-        return text
+        return pytesseract.image_to_string(img, lang="eng")
     except Exception as exc:
-        print(f"[PARSER] OCR failed on page {page.number + 1}: {exc}")
+        print(f"[PARSER] OCR failed on page {page_num + 1}: {exc}")
         return ""
 
 
+def _ocr_pages(doc: fitz.Document, page_nums: list[int]) -> list[str]:
+    """
+    OCR the given pages concurrently, results in page_nums order.
+
+    Pages are rendered in batches of 2 × workers so a long scan never holds
+    every page image in memory at once.
+    """
+    if not _TESSERACT_AVAILABLE or not page_nums:
+        return [""] * len(page_nums)
+    if len(page_nums) == 1:
+        return [_ocr_image(_render_page(doc[page_nums[0]]), page_nums[0])]
+
+    workers = min(OCR_CONCURRENCY, len(page_nums))
+    batch = 2 * workers
+    texts: list[str] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(page_nums), batch):
+            nums = page_nums[i:i + batch]
+            images = [_render_page(doc[n]) for n in nums]
+            texts.extend(pool.map(_ocr_image, images, nums))
+    return texts
+
+
+# ── Text-layer extraction ────────────────────────────────────────────────────
+
+_extract_pool: ProcessPoolExecutor | None = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Lazy process pool for text extraction (spawn: safe under server threads)."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extract_pool
+
+
+def _extract_text_range(filepath: str, start: int, stop: int) -> list[str]:
+    """Worker: native text of pages [start, stop). fitz Documents don't pickle."""
+    with fitz.open(filepath) as doc:
+        return [doc[n].get_text("text") for n in range(start, stop)]
+
+
+def _extract_all_text(doc: fitz.Document, filepath: str) -> list[str]:
+    """Native text of every page, sharded across processes for long PDFs."""
+    n_pages = len(doc)
+    if n_pages < PARALLEL_MIN_PAGES or EXTRACT_WORKERS < 2:
+        return [doc[n].get_text("text") for n in range(n_pages)]
+
+    step = -(-n_pages // EXTRACT_WORKERS)  # ceil
+    bounds = [(s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+    pool = _get_extract_pool()
+    futures = [pool.submit(_extract_text_range, filepath, s, e) for s, e in bounds]
+    texts: list[str] = []
+    for f in futures:
+        texts.extend(f.result())
+    return texts
+
+
 # ── Public API ───────────────────────────────────────────────────────────────
 
 def parse_pdf(filepath: str, filename: str) -> list[dict]:
@@ -118,32 +233,30 @@ def parse_pdf(filepath: str, filename: str) -> list[dict]:
         (1-indexed pages, empty/blank pages excluded)
     """
     doc = fitz.open(filepath)
-    raw_pages: list[str] = []
-    ocr_flags: list[bool] = []
-
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text("text")
-        used_ocr = False
-
-        if len(text.strip()) < OCR_MIN_CHARS:
-            ocr_text = _ocr_page(page)
-            if len(ocr_text.strip()) > len(text.strip()):
-                text = ocr_text
-                used_ocr = True
-                print(
-                    f"[PARSER] OCR applied: {filename} p{page_num + 1} "
-                    f"({len(ocr_text.strip())} chars recovered)"
-                )
-
-        raw_pages.append(text)
-        ocr_flags.append(used_ocr)
+    raw_pages = _extract_all_text(doc, filepath)
+    ocr_flags = [False] * len(raw_pages)
+
+    # Pages without a usable text layer → OCR, all at once
+    needs_ocr = [n for n, text in enumerate(raw_pages) if len(text.strip()) < OCR_MIN_CHARS]
+    for page_num, ocr_text in zip(needs_ocr, _ocr_pages(doc, needs_ocr)):
+        if len(ocr_text.strip()) > len(raw_pages[page_num].strip()):
+            raw_pages[page_num] = ocr_text
+            ocr_flags[page_num] = True
+            print(
+                f"[PARSER] OCR applied: {filename} p{page_num + 1} "
+                f"({len(ocr_text.strip())} chars recovered)"
+            )
 
     noise_lines = _detect_repeating_lines(raw_pages, threshold=2)
+    noise_re = _noise_regex(noise_lines)
 
+    # Clean in place of the raw text: each page's raw string is released as
+    # soon as its cleaned form exists, so peak memory stays ~1× the document
+    # text instead of raw + cleaned side by side.
     pages: list[dict] = []
-    for page_num, (raw_text, used_ocr) in enumerate(zip(raw_pages, ocr_flags)):
-        cleaned = _clean_page(raw_text, noise_lines)
+    for page_num, used_ocr in enumerate(ocr_flags):
+        raw_text, raw_pages[page_num] = raw_pages[page_num], None
+        cleaned = _clean_page(raw_text, noise_lines, noise_re)
         if cleaned:
             pages.append({
                 "text": cleaned,
@@ -0,0 +1,75 @@
+"""
+Parse → chunk glue shared by session and library ingestion.
+
+Results are cached in the disk cache keyed by a BLAKE2b hash of the PDF
+bytes, so a re-upload of the same file skips parsing and chunking. The
+namespace carries the chunking parameters: changing them starts a fresh
+cache rather than serving chunks cut the old way.
+
+save_upload() writes an uploaded PDF to its final path atomically, so the
+parser only ever sees complete files.
+"""
+
+import hashlib
+import os
+import shutil
+
+from fastapi import UploadFile
+
+from l88_backend.config import CHUNK_SIZE, CHUNK_OVERLAP, PARSE_CACHE_TTL_S
+from l88_backend.disk_cache import DiskCache
+from l88_backend.ingestion.parser import parse_pdf
+from l88_backend.ingestion.chunker import chunk_pages
+
+
+_parse_cache = DiskCache(f"parse:{CHUNK_SIZE}:{CHUNK_OVERLAP}", ttl_seconds=PARSE_CACHE_TTL_S)
+
+
+def save_upload(file: UploadFile, filepath: str) -> None:
+    """
+    Stream an upload to `filepath` in 1 MiB chunks (never the whole PDF in
+    memory). Written to a temp name, synced, then renamed: a crash or client
+    disconnect mid-upload leaves neither a truncated PDF nor a stray .tmp.
+    """
+    tmp_path = filepath + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(file.file, f, length=1 << 20)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _file_hash(filepath: str) -> bytes:
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).digest()
+
+
+def parse_and_chunk(filepath: str, filename: str, doc_id: str, source: str) -> tuple[int, list[dict]]:
+    """
+    Parse one PDF and chunk it (cached by file content).
+
+    Returns:
+        (page_count, chunks) — chunks carry "doc_id" and "source".
+    """
+    key = _file_hash(filepath)
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        page_count, chunks = cached["page_count"], cached["chunks"]
+        print(f"[PIPELINE] {filename}: {len(chunks)} chunks from parse cache")
+    else:
+        pages = parse_pdf(filepath, filename)
+        page_count, chunks = len(pages), chunk_pages(pages)
+        _parse_cache.put(key, {"page_count": page_count, "chunks": chunks})
+    for chunk in chunks:
+        # The same bytes may have been cached under another upload's name
+        chunk["filename"] = filename
+        chunk["doc_id"] = doc_id
+        chunk["source"] = source
+    return page_count, chunks
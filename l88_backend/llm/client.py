@@ -2,28 +2,48 @@
 LLM client — thin Ollama wrapper via langchain_ollama.
 
 GPU primary (qwen2.5-7b-awq), CPU fallback (qwen2.5:14b).
-Singleton _llm instance reused across all calls to avoid repeated instantiation.
+ChatOllama instances are cached per (model, num_ctx), so every call — including
+explicit-model ones — reuses one client and its keep-alive connections.
 Small num_ctx for analyzer/rewriter, full 16384 for generator.
+
+Callers with a large static instruction block pass it as `system` so it
+forms a stable prompt prefix; keep_alive keeps the model (and its prefix
+KV cache) resident in Ollama between requests.
+
+call_llm_cached() memoizes raw responses by blake2b(prompt) for callers with
+deterministic prompts (rewriter), so an identical prompt never hits Ollama twice.
 """
 
-from langchain_ollama import ChatOllama
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
 
-from l88_backend.config import LLM_MODEL, LLM_TEMPERATURE, LLM_NUM_CTX
+from langchain_ollama import ChatOllama
 
-_llm = ChatOllama(
-    model=LLM_MODEL,
-    temperature=LLM_TEMPERATURE,
-    num_ctx=LLM_NUM_CTX,
+from l88_backend.config import (
+    LLM_MODEL, LLM_TEMPERATURE, LLM_NUM_CTX, LLM_KEEP_ALIVE, OLLAMA_BASE_URL,
 )
 
-_llm_small = ChatOllama(
-    model=LLM_MODEL,
-    temperature=LLM_TEMPERATURE,
-    num_ctx=2048,
-)
+
+@functools.lru_cache(maxsize=8)
+def _get_llm(model: str, num_ctx: int) -> ChatOllama:
+    """One ChatOllama (and its HTTP client) per (model, num_ctx), reused across calls."""
+    return ChatOllama(
+        base_url=OLLAMA_BASE_URL,
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        num_ctx=num_ctx,
+        keep_alive=LLM_KEEP_ALIVE,
+    )
 
 
-def call_llm(prompt: str, model: str | None = None, small_ctx: bool = False) -> str:
+def call_llm(
+    prompt: str,
+    model: str | None = None,
+    small_ctx: bool = False,
+    system: str | None = None,
+) -> str:
     """
     Send a prompt to Ollama and return the raw response string.
 
@@ -32,20 +52,41 @@ def call_llm(prompt: str, model: str | None = None, small_ctx: bool = False) ->
         model: Ollama model name. Defaults to config.LLM_MODEL.
         small_ctx: If True, uses 2048 context window. For short prompts
                    like analyzer and rewriter where 16384 is wasteful.
+        system: Optional static instructions sent as a system message ahead
+                of `prompt`. Keep it identical across calls for prefix reuse.
 
     Returns:
         The LLM's response as a plain string.
     """
-    if model is not None:
-        llm = ChatOllama(
-            model=model,
-            temperature=LLM_TEMPERATURE,
-            num_ctx=LLM_NUM_CTX,
-        )
-    elif small_ctx:
-        llm = _llm_small
-    else:
-        llm = _llm
-
-    response = llm.invoke(prompt)
-    return response.content
\ No newline at end of file
+    llm = _get_llm(model or LLM_MODEL, 2048 if small_ctx else LLM_NUM_CTX)
+    messages = [("system", system), ("human", prompt)] if system is not None else prompt
+    return llm.invoke(messages).content
+
+
+RESPONSE_CACHE_MAX = 2048
+_response_cache: OrderedDict[bytes, str] = OrderedDict()
+_response_lock = threading.Lock()
+
+
+def call_llm_cached(prompt: str, small_ctx: bool = False) -> str:
+    """
+    call_llm() behind an exact-match LRU keyed on blake2b(prompt, small_ctx).
+
+    Only use for temperature-0 style callers where the same prompt should
+    yield the same answer; the raw text is cached, parsing stays with the caller.
+    """
+    key = hashlib.blake2b(prompt.encode(), digest_size=16, person=b"small" if small_ctx else b"full").digest()
+    with _response_lock:
+        text = _response_cache.get(key)
+        if text is not None:
+            _response_cache.move_to_end(key)
+            return text
+
+    text = call_llm(prompt, small_ctx=small_ctx)
+
+    with _response_lock:
+        _response_cache[key] = text
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+    return text
@@ -5,16 +5,26 @@ Mounts all routers. On startup:
   1. Creates database tables
   2. Seeds hardcoded users
   3. Checks Ollama connectivity (warns if unreachable)
+  4. Loads and warms the embedding model (first request skips the cold load)
+  5. Warms the query-embedding cache in the background
+
+app.state.ollama is a keep-alive httpx.AsyncClient for direct Ollama API
+calls, opened on startup and closed on shutdown. Shutdown also saves any
+index changes the index writer has not flushed yet.
 """
 
+import asyncio
 import logging
+import threading
 
 import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from l88_backend.config import LLM_MODEL
+from l88_backend.config import LLM_MODEL, OLLAMA_BASE_URL
 from l88_backend.database import create_db_and_tables, seed_users
+from l88_backend.ingestion.embedder import warm_up, warm_query_cache
+from l88_backend.retrieval import index_writer
 
 # Routers
 from l88_backend.routers import auth, sessions, chat, documents, members, scratchpad
@@ -58,7 +68,7 @@ app.include_router(admin_system.router)
 # ── Startup Event ────────────────────────────────────────────────────
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     """Initialize database and check dependencies."""
     # 1. Create tables
     create_db_and_tables()
@@ -68,9 +78,14 @@ def on_startup():
     seed_users()
     logger.info("Hardcoded users seeded.")
 
-    # 3. Ollama health check
+    # 3. Shared Ollama client + health check
+    app.state.ollama = httpx.AsyncClient(
+        base_url=OLLAMA_BASE_URL,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=16),
+    )
     try:
-        resp = httpx.get("http://localhost:11434/api/tags", timeout=5.0)
+        resp = await app.state.ollama.get("/api/tags", timeout=5.0)
         if resp.status_code == 200:
             models = [m["name"] for m in resp.json().get("models", [])]
             if any(LLM_MODEL in m for m in models):
@@ -84,10 +99,28 @@ def on_startup():
             logger.warning("⚠ Ollama responded with non-200. Check Ollama status.")
     except Exception:
         logger.warning(
-            "⚠ Ollama is not reachable at localhost:11434. "
+            f"⚠ Ollama is not reachable at {OLLAMA_BASE_URL}. "
             "Start Ollama with 'ollama serve &' before sending queries."
         )
 
+    # 4. Embedding model — off the event loop; a failed load (e.g. download
+    # still in progress) falls back to lazy loading on first use
+    try:
+        await asyncio.to_thread(warm_up)
+        logger.info("Embedding model loaded.")
+    except Exception as exc:
+        logger.warning(f"⚠ Embedding model warm-up failed ({exc}); will load on first use.")
+
+    # 5. Embed common queries off the startup path
+    threading.Thread(target=warm_query_cache, name="warm-queries", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Save indexes still pending in the index writer; close the shared Ollama client."""
+    await asyncio.to_thread(index_writer.flush_all)
+    await app.state.ollama.aclose()
+
 
 # ── Root ─────────────────────────────────────────────────────────────
 
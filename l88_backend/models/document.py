@@ -12,6 +12,7 @@ class Document(SQLModel, table=True):
     source="session" → belongs to a session (session_id set).
     source="library" → curated library doc (session_id is None).
     selected=True → included in next RAG query for that session.
+    status="processing" until background ingestion finishes ("ready" / "failed").
     """
 
     id: str = Field(primary_key=True)                # UUID string
@@ -23,3 +24,4 @@ class Document(SQLModel, table=True):
     page_count: int = 0
     chunk_count: int = 0
     selected: bool = True                            # checkbox state
+    status: str = "ready"                            # "processing" | "ready" | "failed"
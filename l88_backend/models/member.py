@@ -1,5 +1,6 @@
 """SessionMember model — per-session role overrides."""
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -11,6 +12,9 @@ class SessionMember(SQLModel, table=True):
     This allows Bob (global 'chat') to be session-level 'admin'.
     """
 
+    # Covers list_sessions' join: user_id lookup yields session_id from the index
+    __table_args__ = (Index("ix_sessionmember_user_session", "user_id", "session_id"),)
+
     id: int | None = Field(default=None, primary_key=True)
     session_id: str = Field(index=True)              # FK → Session
     user_id: int = Field(index=True)                 # FK → User
@@ -0,0 +1,157 @@
+"""
+Index writer — deferred, coalesced saves of modified FAISS / BM25 stores.
+
+Writers modify a store in memory and mark_dirty() it instead of saving it
+themselves. A background flusher saves each dirty directory every
+INDEX_FLUSH_INTERVAL_S, so a burst of uploads to one session costs one
+serialization per store instead of one per upload. Until then, open_store()
+hands later writers the same unsaved instance, so no change is lost to a
+reload from disk.
+
+All access to one index directory — open, modify, mark_dirty, and the
+flusher's save — runs under locked(index_dir). on_flush callbacks run after
+the directory's files are replaced, i.e. once readers can see the change
+(mark a document ready, invalidate the response cache). flush_all() saves
+synchronously; call it on shutdown.
+
+Saved stores stay resident in an LRU of INDEX_RESIDENT_MAX entries, so the
+next upload to a hot session skips deserializing its indexes again. This is
+sound because every index write goes through this module. An exception
+inside locked() evicts the directory's resident stores — they may be half
+modified — and evict() drops a directory whose session is gone.
+"""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+from l88_backend.config import INDEX_FLUSH_INTERVAL_S, INDEX_RESIDENT_MAX
+
+
+class _Pending:
+    """Unsaved stores of one directory, by class, and what to run once saved."""
+
+    def __init__(self):
+        self.stores: dict[type, object] = {}
+        self.on_flush: list = []
+
+
+_pending: dict[str, _Pending] = {}
+# (index_dir, class) → saved store, least recently used first
+_resident: "OrderedDict[tuple[str, type], object]" = OrderedDict()
+_pending_lock = threading.Lock()   # guards _pending and _resident
+
+_dir_locks: dict[str, threading.RLock] = defaultdict(threading.RLock)
+_dir_locks_guard = threading.Lock()
+
+_flusher: threading.Thread | None = None
+_flusher_lock = threading.Lock()
+
+
+@contextmanager
+def locked(index_dir: str):
+    """Serialize every read-modify-write of `index_dir` (reentrant)."""
+    with _dir_locks_guard:
+        lock = _dir_locks[index_dir]
+    with lock:
+        try:
+            yield
+        except BaseException:
+            evict(index_dir)
+            raise
+
+
+def _keep_resident(index_dir: str, store) -> None:
+    """Caller holds _pending_lock."""
+    key = (index_dir, type(store))
+    _resident[key] = store
+    _resident.move_to_end(key)
+    while len(_resident) > INDEX_RESIDENT_MAX:
+        _resident.popitem(last=False)
+
+
+def open_store(cls, index_dir: str, **load_kwargs):
+    """
+    The unsaved instance of `cls` for `index_dir` if one is pending, else the
+    resident one, else cls.load(index_dir, **load_kwargs). Caller holds
+    locked(index_dir).
+    """
+    with _pending_lock:
+        entry = _pending.get(index_dir)
+        if entry is not None and cls in entry.stores:
+            return entry.stores[cls]
+        key = (index_dir, cls)
+        store = _resident.get(key)
+        if store is not None:
+            _resident.move_to_end(key)
+            return store
+    store = cls.load(index_dir, **load_kwargs)
+    with _pending_lock:
+        _keep_resident(index_dir, store)
+    return store
+
+
+def evict(index_dir: str) -> None:
+    """Forget `index_dir`'s resident stores; the next open_store reloads from disk."""
+    with _pending_lock:
+        for key in [k for k in _resident if k[0] == index_dir]:
+            del _resident[key]
+
+
+def mark_dirty(index_dir: str, *stores, on_flush=None) -> None:
+    """Queue `stores` to be saved to `index_dir`. Caller holds locked(index_dir)."""
+    with _pending_lock:
+        entry = _pending.setdefault(index_dir, _Pending())
+        for store in stores:
+            entry.stores[type(store)] = store
+        if on_flush is not None:
+            entry.on_flush.append(on_flush)
+    _ensure_flusher()
+
+
+def flush(index_dir: str) -> None:
+    """Save `index_dir`'s pending stores now, then run its callbacks."""
+    with locked(index_dir):
+        with _pending_lock:
+            entry = _pending.get(index_dir)
+        if entry is None:
+            return
+        for store in entry.stores.values():
+            store.save(index_dir)
+        with _pending_lock:
+            del _pending[index_dir]
+            for store in entry.stores.values():
+                _keep_resident(index_dir, store)
+    for callback in entry.on_flush:
+        try:
+            callback()
+        except Exception as exc:
+            print(f"[INDEX] on_flush callback for {index_dir} failed: {exc}")
+
+
+def flush_all() -> None:
+    """Save every pending directory. A failed save stays pending for the next pass."""
+    with _pending_lock:
+        dirs = list(_pending)
+    for index_dir in dirs:
+        try:
+            flush(index_dir)
+        except Exception as exc:
+            print(f"[INDEX] Saving {index_dir} failed, will retry: {exc}")
+
+
+def _run() -> None:
+    while True:
+        time.sleep(INDEX_FLUSH_INTERVAL_S)
+        flush_all()
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_run, name="index-flusher", daemon=True)
+            _flusher.start()
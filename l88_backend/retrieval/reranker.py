@@ -2,25 +2,223 @@
 Reranker — BAAI/bge-reranker-v2-m3 on CPU.
 
 Cross-encoder that scores (query, chunk) pairs for precise relevance ranking.
-Singleton model loader.
+One lazily loaded instance per model. With FAST_RERANK (L88_FAST_RERANK=1)
+rerank() defaults to RERANKER_MODEL_FAST, a distilled MiniLM cross-encoder;
+callers pass rerank_quality=True to force the full model.
+
+Scores are memoized in an LRU keyed by (model, query, BLAKE2b of chunk text): chunks
+that resurface across turns or rewrite retries skip the forward pass, and
+only uncached pairs go to the model, in one predict call. Those pairs are
+sorted by chunk length first so each mini-batch pads only to its own longest
+member, then scores are put back in input order.
+
+RERANK_BACKEND="onnx" swaps CrossEncoder for an ONNX Runtime export
+(O2 fusions + int8 dynamic quantization by default) — needs
+`pip install optimum[onnxruntime]`. The graph is exported once into
+MODEL_STORAGE and reused on later starts.
 """
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import torch
 from sentence_transformers import CrossEncoder
 
-from l88_backend.config import RERANKER_MODEL
+from l88_backend.config import (
+    RERANKER_MODEL, RERANKER_MODEL_FAST, FAST_RERANK, RERANK_CACHE_MAX, RERANK_BATCH_SIZE,
+    RERANK_BACKEND, RERANK_ONNX_QUANTIZE, MODEL_STORAGE, TORCH_NUM_THREADS,
+)
 
-_model: CrossEncoder | None = None
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+    from transformers import AutoTokenizer
+    _ONNX_AVAILABLE = True
+except ImportError:
+    _ONNX_AVAILABLE = False
 
+_models: dict[str, object] = {}   # model name → _TorchCrossEncoder | _OnnxCrossEncoder
+_model_lock = threading.Lock()
 
-def _get_model() -> CrossEncoder:
-    """Lazy-load the reranker model (CPU)."""
-    global _model
-    if _model is None:
-        _model = CrossEncoder(RERANKER_MODEL, device="cpu")
-    return _model
 
+class _TorchCrossEncoder:
+    """
+    CrossEncoder with predict() run directly under torch.inference_mode.
 
-def rerank(query: str, chunks: list[dict], top_n: int = 5) -> list[dict]:
+    The tokenizer and underlying model are bound once; each batch is one
+    tokenizer call and one forward pass, with no autograd bookkeeping and
+    none of CrossEncoder.predict's per-call dataloader setup.
+    """
+
+    def __init__(self, name: str):
+        self.encoder = CrossEncoder(name, device="cpu")
+        self.tokenizer = self.encoder.tokenizer
+        self.model = self.encoder.model.eval()
+        # The bound CrossEncoder.predict truncated to: the model's configured
+        # limit, else the tokenizer's
+        self.max_length = self.encoder.max_length or self.tokenizer.model_max_length
+
+    def predict(self, pairs: list[tuple[str, str]], batch_size: int = 32, **_) -> np.ndarray:
+        out = []
+        with torch.inference_mode():
+            for i in range(0, len(pairs), batch_size):
+                batch = pairs[i:i + batch_size]
+                enc = self.tokenizer(
+                    [q for q, _ in batch], [t for _, t in batch],
+                    padding=True, truncation=True, max_length=self.max_length, return_tensors="pt",
+                )
+                logits = self.model(**enc).logits[:, 0]
+                # Sigmoid, as CrossEncoder applies for one-label models
+                out.append(torch.sigmoid(logits.float()).numpy())
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.float32)
+
+
+_BUCKET_MIN = 64   # shortest padded sequence length for ONNX batches
+
+
+def _buckets(max_length: int) -> tuple[int, ...]:
+    """Padded lengths for ONNX batches: powers of two below max_length, then max_length."""
+    sizes = []
+    size = _BUCKET_MIN
+    while size < max_length:
+        sizes.append(size)
+        size *= 2
+    return (*sizes, max_length)
+
+
+class _OnnxCrossEncoder:
+    """
+    ONNX Runtime cross-encoder with the same predict() as _TorchCrossEncoder.
+
+    Sigmoid over the single relevance logit, as CrossEncoder applies for
+    one-label models — scores stay in [0, 1], so EVAL_* thresholds still hold.
+    """
+
+    def __init__(self, model_dir: str, file_name: str):
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = TORCH_NUM_THREADS
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForSequenceClassification.from_pretrained(
+            model_dir, file_name=file_name, session_options=opts,
+        )
+        # Same truncation as CrossEncoder; the last bucket pads to exactly it
+        self.max_length = self.tokenizer.model_max_length
+        self.buckets = _buckets(self.max_length)
+
+    def predict(self, pairs: list[tuple[str, str]], batch_size: int = 32, **_) -> np.ndarray:
+        """
+        Tokenize every pair once, then run each length bucket padded only to
+        its bucket size — a few fixed shapes ORT's arena can reuse, and short
+        pairs never pay for max_length padding.
+        """
+        n = len(pairs)
+        enc = self.tokenizer(
+            [q for q, _ in pairs], [t for _, t in pairs], truncation=True, max_length=self.max_length,
+        )
+        lengths = np.fromiter(map(len, enc["input_ids"]), dtype=np.int32, count=n)
+        bucket_of = np.searchsorted(self.buckets, lengths)
+
+        logits = np.empty(n, dtype=np.float32)
+        for b, pad_len in enumerate(self.buckets):
+            idx = np.flatnonzero(bucket_of == b)
+            for i in range(0, len(idx), batch_size):
+                sel = idx[i:i + batch_size]
+                feats = self.tokenizer.pad(
+                    {k: [enc[k][j] for j in sel] for k in enc.keys()},
+                    padding="max_length", max_length=pad_len, return_tensors="np",
+                )
+                logits[sel] = np.asarray(self.model(**feats).logits, dtype=np.float32)[:, 0]
+        return 1.0 / (1.0 + np.exp(-logits))
+
+
+def _load_onnx(name: str) -> _OnnxCrossEncoder:
+    """Export → optimize (O2) → optionally quantize once; load from disk after."""
+    base = os.path.join(MODEL_STORAGE, name.replace("/", "__") + "-onnx")
+    file_name = "model_quantized.onnx" if RERANK_ONNX_QUANTIZE else "model_optimized.onnx"
+    if not os.path.exists(os.path.join(base, file_name)):
+        print(f"[RERANKER] Exporting {name} to ONNX in {base}")
+        model = ORTModelForSequenceClassification.from_pretrained(name, export=True)
+        AutoTokenizer.from_pretrained(name).save_pretrained(base)
+        ORTOptimizer.from_pretrained(model).optimize(
+            save_dir=base, optimization_config=OptimizationConfig(optimization_level=2),
+        )
+        if RERANK_ONNX_QUANTIZE:
+            quantizer = ORTQuantizer.from_pretrained(base, file_name="model_optimized.onnx")
+            quantizer.quantize(
+                save_dir=base,
+                quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False),
+            )
+    return _OnnxCrossEncoder(base, file_name)
+
+_score_cache: OrderedDict[tuple[str, str, bytes], float] = OrderedDict()
+_score_lock = threading.Lock()
+
+
+def _get_model(name: str = RERANKER_MODEL):
+    """Lazy-load a reranker model on CPU (ONNX if configured)."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    # Double-checked: concurrent cold requests would otherwise each load a copy
+    with _model_lock:
+        model = _models.get(name)
+        if model is None:
+            if RERANK_BACKEND == "onnx" and _ONNX_AVAILABLE:
+                model = _load_onnx(name)
+            else:
+                if RERANK_BACKEND == "onnx":
+                    print("[RERANKER] optimum[onnxruntime] not installed — using CrossEncoder")
+                model = _TorchCrossEncoder(name)
+                torch.set_num_threads(TORCH_NUM_THREADS)
+            _models[name] = model
+    return model
+
+
+def _predict(name: str, query: str, texts: list[str]) -> np.ndarray:
+    """Length-sorted batched predict; scores come back in input order."""
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    scores = _get_model(name).predict(
+        [(query, texts[i]) for i in order],
+        batch_size=RERANK_BATCH_SIZE,
+        show_progress_bar=False,
+    )
+    out = np.empty(len(texts), dtype=np.float32)
+    out[order] = scores
+    return out
+
+
+def _score(name: str, query: str, texts: list[str]) -> list[float]:
+    """Cross-encoder scores for (query, text) pairs; only cache misses reach the model."""
+    keys = [(name, query, hashlib.blake2b(t.encode(), digest_size=16).digest()) for t in texts]
+    found: dict[tuple[str, str, bytes], float] = {}
+    with _score_lock:
+        for k in keys:
+            score = _score_cache.get(k)
+            if score is not None:
+                _score_cache.move_to_end(k)
+                found[k] = score
+
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    if missing:
+        by_key = dict(zip(keys, texts))
+        scores = _predict(name, query, [by_key[k] for k in missing])
+        with _score_lock:
+            for k, score in zip(missing, scores):
+                found[k] = _score_cache[k] = float(score)
+            while len(_score_cache) > RERANK_CACHE_MAX:
+                _score_cache.popitem(last=False)
+
+    return [found[k] for k in keys]
+
+
+def rerank(
+    query: str, chunks: list[dict], top_n: int = 5, rerank_quality: bool = False,
+) -> tuple[list[dict], float]:
     """
     Rerank chunks by cross-encoder relevance to query.
 
@@ -28,22 +226,25 @@ def rerank(query: str, chunks: list[dict], top_n: int = 5) -> list[dict]:
         query: The user's (or rewritten) query string.
         chunks: List of chunk dicts with at least a 'text' key.
         top_n: Number of top-scoring chunks to return.
+        rerank_quality: Use RERANKER_MODEL even when FAST_RERANK is set.
 
-        Returns:
-        Tuple of (top-N chunks sorted by reranker score, top score as float).
+    Returns:
+        Tuple of (top-N chunks sorted by reranker score, top score as float);
+        ([], 0.0) when there is nothing to rank.
     """
     if not chunks:
-        return []
-
-    model = _get_model()
+        return [], 0.0
 
-    pairs = [(query, c["text"]) for c in chunks]
-    scores = model.predict(pairs)
+    name = RERANKER_MODEL_FAST if FAST_RERANK and not rerank_quality else RERANKER_MODEL
+    scores = np.asarray(_score(name, query, [c["text"] for c in chunks]), dtype=np.float32)
 
-    for chunk, score in zip(chunks, scores):
-        chunk["rerank_score"] = float(score)
+    # O(N) selection of the top-N, then sort only those
+    k = min(top_n, len(chunks))
+    if k <= 0:
+        return [], 0.0
+    top_idx = np.argpartition(-scores, k - 1)[:k]
+    top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
 
-    ranked = sorted(chunks, key=lambda c: c["rerank_score"], reverse=True)
-    top = ranked[:top_n]
-    top_score = top[0]["rerank_score"] if top else 0.0
-    return top, top_score
\ No newline at end of file
+    # Copies: callers' chunk dicts are left untouched
+    top = [{**chunks[i], "rerank_score": float(scores[i])} for i in top_idx]
+    return top, top[0]["rerank_score"]
@@ -3,13 +3,159 @@ FAISS vector store — IndexFlatIP wrapper (L2-normalized = cosine).
 
 Stores vectors + chunk metadata side by side.
 Supports save/load to disk for persistence across restarts.
+
+index_type="hnsw" uses IndexHNSWFlat (inner-product metric) instead: sub-linear
+approximate search for large, slowly growing indexes such as the library.
+index_type="sq8" stores 8-bit scalar-quantized codes (1 byte/dim, 4x smaller
+than float32), trained on the first batch added.
+Session indexes stay flat — small, and searched exhaustively.
+
+remove_doc() deletes one document's vectors in place. Flat and SQ8 indexes
+compact with remove_ids, which keeps the surviving vectors in order, so row
+positions stay aligned with the metadata columns and no id map is needed.
+HNSW graphs can't drop nodes; they are rebuilt from their own stored
+vectors. Either way nothing is re-parsed or re-embedded.
+
+Chunk metadata is held column-wise (struct of arrays): text in a list, page
+and chunk_idx in int32 arrays, and the heavily repeated doc_id / filename /
+source strings dictionary-coded as int32 codes. Search gathers its hits'
+columns with one fancy-index per column instead of copying per-row dicts.
+
+Metadata persists as those columns — msgpack, zstd-compressed — in
+metadata.msgpack.zst, so loading skips per-row JSON parsing and dict
+building. Legacy metadata.json stores are still read, and replaced on the
+next save.
+
+load(mmap=True) maps the vector codes read-only instead of copying them onto
+the heap; save() writes new files and renames them over the old ones, so a
+mapped index never sees its file change underneath it.
 """
 
 import json
 import os
+import struct
 
 import faiss
 import numpy as np
+import ormsgpack
+import zstandard
+
+from l88_backend.config import HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH, FAISS_NUM_THREADS
+
+# FAISS otherwise inherits OMP_NUM_THREADS, which l88_backend caps for torch
+faiss.omp_set_num_threads(FAISS_NUM_THREADS)
+
+# Maps flat vector codes (Flat / HNSWFlat storage); older FAISS only has IO_FLAG_MMAP
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+META_FILE = "metadata.msgpack.zst"
+_LEGACY_META_FILE = "metadata.json"
+_META_VERSION = 1
+
+_INT_COLS = ("page", "chunk_idx")
+_CODED_COLS = ("doc_id", "filename", "source")
+
+
+class _ChunkColumns:
+    """Struct-of-arrays chunk metadata; rows() rebuilds chunk dicts on demand."""
+
+    def __init__(self):
+        self.text: list[str] = []
+        self.ints = {k: np.zeros(0, dtype=np.int32) for k in _INT_COLS}
+        self.codes = {k: np.zeros(0, dtype=np.int32) for k in _CODED_COLS}
+        self.vocab: dict[str, list] = {k: [] for k in _CODED_COLS}
+        self._lookup: dict[str, dict] = {k: {} for k in _CODED_COLS}
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def _code(self, col: str, value) -> int:
+        lookup = self._lookup[col]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.vocab[col])
+            self.vocab[col].append(value)
+        return code
+
+    def extend(self, chunks: list[dict]) -> None:
+        n = len(chunks)
+        self.text.extend(c["text"] for c in chunks)
+        for col in _INT_COLS:
+            new = np.fromiter((c.get(col, 0) for c in chunks), dtype=np.int32, count=n)
+            self.ints[col] = np.concatenate([self.ints[col], new])
+        for col in _CODED_COLS:
+            new = np.fromiter((self._code(col, c.get(col)) for c in chunks), dtype=np.int32, count=n)
+            self.codes[col] = np.concatenate([self.codes[col], new])
+
+    def pack(self) -> bytes:
+        """Columns as one zstd-compressed msgpack blob (int arrays as raw bytes)."""
+        return zstandard.ZstdCompressor(level=3).compress(ormsgpack.packb({
+            "version": _META_VERSION,
+            "text": self.text,
+            "ints": {k: v.tobytes() for k, v in self.ints.items()},
+            "codes": {k: v.tobytes() for k, v in self.codes.items()},
+            "vocab": self.vocab,
+        }))
+
+    @classmethod
+    def unpack(cls, blob: bytes) -> "_ChunkColumns":
+        data = ormsgpack.unpackb(zstandard.ZstdDecompressor().decompressobj().decompress(blob))
+        cols = cls()
+        cols.text = data["text"]
+        cols.ints = {k: np.frombuffer(v, dtype=np.int32).copy() for k, v in data["ints"].items()}
+        cols.codes = {k: np.frombuffer(v, dtype=np.int32).copy() for k, v in data["codes"].items()}
+        cols.vocab = data["vocab"]
+        cols._lookup = {k: {v: i for i, v in enumerate(vals)} for k, vals in cols.vocab.items()}
+        return cols
+
+    @classmethod
+    def read(cls, directory: str) -> "_ChunkColumns":
+        """Columns from a store directory: msgpack file, else legacy JSON, else empty."""
+        try:
+            with open(os.path.join(directory, META_FILE), "rb") as f:
+                return cls.unpack(f.read())
+        except FileNotFoundError:
+            pass
+        cols = cls()
+        try:
+            with open(os.path.join(directory, _LEGACY_META_FILE)) as f:
+                cols.extend(json.load(f))
+        except FileNotFoundError:
+            pass
+        return cols
+
+    def matching(self, col: str, value) -> np.ndarray:
+        """Boolean row mask where coded column `col` equals `value`."""
+        code = self._lookup[col].get(value)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.codes[col] == code
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop every row where `mask` is False (vocabularies are left as is)."""
+        self.text = [t for t, k in zip(self.text, mask.tolist()) if k]
+        self.ints = {k: v[mask] for k, v in self.ints.items()}
+        self.codes = {k: v[mask] for k, v in self.codes.items()}
+
+    def rows(self, idx: np.ndarray) -> list[dict]:
+        """Chunk dicts for row indices `idx`, one gather per column."""
+        text = self.text
+        page = self.ints["page"][idx].tolist()
+        chunk_idx = self.ints["chunk_idx"][idx].tolist()
+        coded = {
+            col: [self.vocab[col][c] for c in self.codes[col][idx].tolist()]
+            for col in _CODED_COLS
+        }
+        out = []
+        for j, i in enumerate(idx.tolist()):
+            row = {"text": text[i], "page": page[j], "filename": coded["filename"][j],
+                   "chunk_idx": chunk_idx[j]}
+            for col in ("doc_id", "source"):
+                if coded[col][j] is not None:
+                    row[col] = coded[col][j]
+            out.append(row)
+        return out
 
 
 class VectorStore:
@@ -20,10 +166,66 @@ class VectorStore:
     so inner product == cosine similarity.
     """
 
-    def __init__(self, dimension: int = 768):
+    def __init__(
+        self,
+        dimension: int = 768,
+        index_type: str = "flat",
+        M: int = HNSW_M,
+        ef_construction: int = HNSW_EF_CONSTRUCTION,
+        ef_search: int = HNSW_EF_SEARCH,
+    ):
         self.dimension = dimension
-        self.index = faiss.IndexFlatIP(dimension)
-        self.metadata: list[dict] = []
+        self.index_type = index_type
+        self.index = self._new_index(dimension, index_type, M, ef_construction, ef_search)
+        self._cols = _ChunkColumns()
+        self.mapped = False     # read-only mmap load; FAISS aborts on writes
+
+    @property
+    def metadata(self) -> list[dict]:
+        """All chunk metadata as dicts, in vector order (materialized on each access)."""
+        return self._cols.rows(np.arange(len(self._cols)))
+
+    @metadata.setter
+    def metadata(self, chunks: list[dict]) -> None:
+        self._cols = _ChunkColumns()
+        self._cols.extend(chunks)
+
+    @staticmethod
+    def _new_index(
+        dimension: int,
+        index_type: str,
+        M: int = HNSW_M,
+        ef_construction: int = HNSW_EF_CONSTRUCTION,
+        ef_search: int = HNSW_EF_SEARCH,
+    ) -> faiss.Index:
+        if index_type == "flat":
+            return faiss.IndexFlatIP(dimension)
+        if index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dimension, M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = ef_construction
+            index.hnsw.efSearch = ef_search
+            return index
+        if index_type == "sq8":
+            return faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_INNER_PRODUCT,
+            )
+        raise ValueError(f"Unknown index_type: {index_type!r}")
+
+    def to_hnsw(
+        self,
+        M: int = HNSW_M,
+        ef_construction: int = HNSW_EF_CONSTRUCTION,
+        ef_search: int = HNSW_EF_SEARCH,
+    ) -> None:
+        """Rebuild a flat index as HNSW in place; vectors and metadata are kept."""
+        if self.index_type != "flat":
+            return
+        index = self._new_index(self.dimension, "hnsw", M, ef_construction, ef_search)
+        if self.index.ntotal:
+            index.add(self.index.reconstruct_n(0, self.index.ntotal))
+        self.index = index
+        self.index_type = "hnsw"
+        self.mapped = False
 
     def add_chunks(self, chunks: list[dict], embeddings: np.ndarray):
         """
@@ -35,8 +237,40 @@ class VectorStore:
         """
         if len(chunks) == 0:
             return
+        if self.mapped:
+            raise RuntimeError("VectorStore loaded with mmap=True is read-only")
+        if not self.index.is_trained:
+            self.index.train(embeddings)    # sq8: quantizer range from the first batch
         self.index.add(embeddings)
-        self.metadata.extend(chunks)
+        self._cols.extend(chunks)
+
+    def remove_doc(self, doc_id: str) -> int:
+        """
+        Delete every vector and metadata row of `doc_id`.
+
+        Returns:
+            Number of chunks removed.
+        """
+        if self.mapped:
+            raise RuntimeError("VectorStore loaded with mmap=True is read-only")
+        drop = self._cols.matching("doc_id", doc_id)
+        n_removed = int(drop.sum())
+        if not n_removed:
+            return 0
+        if self.index_type == "hnsw":
+            hnsw = self.index.hnsw
+            kept = self.index.reconstruct_n(0, self.index.ntotal)[~drop]
+            # Level 1 holds M neighbours per node (level 0 holds 2M)
+            index = self._new_index(
+                self.dimension, "hnsw", hnsw.nb_neighbors(1), hnsw.efConstruction, hnsw.efSearch,
+            )
+            if len(kept):
+                index.add(kept)
+            self.index = index
+        else:
+            self.index.remove_ids(np.flatnonzero(drop).astype(np.int64))
+        self._cols.keep(~drop)
+        return n_removed
 
     def search(self, query_embedding: np.ndarray, top_k: int = 20) -> list[dict]:
         """
@@ -49,51 +283,98 @@ class VectorStore:
         Returns:
             List of chunk dicts with added 'score' field, sorted by score desc.
         """
-        if self.index.ntotal == 0:
-            return []
+        return self.search_batch(query_embedding.reshape(1, -1), top_k)[0]
+
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 20) -> list[list[dict]]:
+        """
+        Search for several queries in one FAISS call (FAISS parallelizes over queries).
 
-        if query_embedding.ndim == 1:
-            query_embedding = query_embedding.reshape(1, -1)
+        Args:
+            query_embeddings: np.ndarray of shape (n_queries, dimension).
+            top_k: Number of results per query.
+
+        Returns:
+            One result list per query, each as returned by search().
+        """
+        if self.index.ntotal == 0:
+            return [[] for _ in range(len(query_embeddings))]
 
         k = min(top_k, self.index.ntotal)
-        scores, indices = self.index.search(query_embedding, k)
+        scores, indices = self.index.search(query_embeddings, k)
 
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < 0:
-                continue
-            chunk = dict(self.metadata[idx])
-            chunk["score"] = float(score)
-            results.append(chunk)
+        batch = []
+        for row_scores, row_indices in zip(scores, indices):
+            valid = row_indices >= 0
+            results = self._cols.rows(row_indices[valid])
+            for chunk, score in zip(results, row_scores[valid].tolist()):
+                chunk["score"] = score
+            batch.append(results)
 
-        return results
+        return batch
 
     def save(self, directory: str):
         """Save the FAISS index and metadata to disk."""
         os.makedirs(directory, exist_ok=True)
-        faiss.write_index(self.index, os.path.join(directory, "index.faiss"))
-        with open(os.path.join(directory, "metadata.json"), "w") as f:
-            json.dump(self.metadata, f)
+        index_path = os.path.join(directory, "index.faiss")
+        meta_path = os.path.join(directory, META_FILE)
+        # Metadata first: readers key their cache on index.faiss's mtime
+        with open(meta_path + ".tmp", "wb") as f:
+            f.write(self._cols.pack())
+        os.replace(meta_path + ".tmp", meta_path)
+        faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        try:
+            os.remove(os.path.join(directory, _LEGACY_META_FILE))
+        except FileNotFoundError:
+            pass
 
     @classmethod
-    def load(cls, directory: str) -> "VectorStore":
-        """Load a saved FAISS index and metadata from disk."""
+    def load(cls, directory: str, mmap: bool = False, index_type: str = "flat") -> "VectorStore":
+        """
+        Load a saved FAISS index and metadata from disk.
+
+        mmap=True maps the vectors read-only — for stores that are only
+        searched. Adding to a mapped store raises. index_type applies only
+        when no index exists yet (a saved index keeps its own type).
+        """
         index_path = os.path.join(directory, "index.faiss")
-        meta_path = os.path.join(directory, "metadata.json")
 
         if not os.path.exists(index_path):
-            return cls()
+            return cls(index_type=index_type)
 
-        index = faiss.read_index(index_path)
-        with open(meta_path) as f:
-            metadata = json.load(f)
+        index = faiss.read_index(index_path, _MMAP_FLAGS if mmap else 0)
 
         store = cls(dimension=index.d)
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            store.index_type = "hnsw"
+        elif isinstance(index, faiss.IndexScalarQuantizer):
+            store.index_type = "sq8"
         store.index = index
-        store.metadata = metadata
+        store._cols = _ChunkColumns.read(directory)
+        store.mapped = mmap
         return store
 
+    @staticmethod
+    def load_metadata(directory: str) -> list[dict]:
+        """Chunk metadata of a saved store without reading its vectors."""
+        cols = _ChunkColumns.read(directory)
+        return cols.rows(np.arange(len(cols)))
+
     @property
     def count(self) -> int:
         """Number of vectors in the index."""
         return self.index.ntotal
+
+    @staticmethod
+    def count_on_disk(directory: str) -> int:
+        """
+        ntotal of a saved index without loading it: every FAISS index file
+        begins with fourcc (4 bytes), d (int32), ntotal (int64).
+        """
+        try:
+            with open(os.path.join(directory, "index.faiss"), "rb") as f:
+                header = f.read(16)
+        except FileNotFoundError:
+            return 0
+        return struct.unpack("<iq", header[4:16])[1]
@@ -3,13 +3,21 @@ Admin system status router.
 
 GET /admin/system/status — returns Ollama model status, FAISS index sizes,
                            disk usage, user list.
+
+Ollama status, directory sizes and vector counts are cached for STATUS_TTL_S,
+so an admin UI polling every few seconds doesn't re-walk storage or re-hit
+Ollama on each request.
 """
 
+import asyncio
 import os
 import shutil
+import threading
+import time
 
 import httpx
-from fastapi import APIRouter, Depends
+from cachetools import TTLCache, cached
+from fastapi import APIRouter, Depends, Request
 from sqlmodel import select
 
 from l88_backend.services.auth_service import get_current_user, require_role
@@ -19,31 +27,54 @@ from l88_backend.config import (
     LLM_MODEL, LLM_MODEL_FALLBACK,
 )
 from l88_backend.models.user import User
+from l88_backend.retrieval.vectorstore import VectorStore
 
 router = APIRouter(prefix="/admin/system", tags=["admin"])
 
+STATUS_TTL_S = 10
 
-def _get_dir_size(path: str) -> int:
-    """Get total size of a directory in bytes."""
+
+def _scan_size(path: str) -> int:
+    """Recursive byte count; DirEntry carries the stat, so no join + isfile + getsize."""
     total = 0
-    if not os.path.exists(path):
-        return 0
-    for dirpath, _, filenames in os.walk(path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            if os.path.isfile(fp):
-                total += os.path.getsize(fp)
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    total += _scan_size(entry.path)
+    except OSError:
+        pass
     return total
 
 
-def _check_ollama() -> dict:
+@cached(TTLCache(maxsize=64, ttl=STATUS_TTL_S), lock=threading.Lock())
+def _get_dir_size(path: str) -> int:
+    """Get total size of a directory in bytes."""
+    return _scan_size(path)
+
+
+_ollama_status: tuple[float, dict] | None = None   # (monotonic ts, result)
+
+
+async def _check_ollama(client: httpx.AsyncClient) -> dict:
     """Check if Ollama is running and list available models."""
+    global _ollama_status
+    if _ollama_status and time.monotonic() - _ollama_status[0] < STATUS_TTL_S:
+        return _ollama_status[1]
+    result = {
+        "running": False,
+        "models": [],
+        "primary_available": False,
+        "fallback_available": False,
+    }
     try:
-        resp = httpx.get("http://localhost:11434/api/tags", timeout=5.0)
+        resp = await client.get("/api/tags", timeout=5.0)
         if resp.status_code == 200:
             data = resp.json()
             models = [m["name"] for m in data.get("models", [])]
-            return {
+            result = {
                 "running": True,
                 "models": models,
                 "primary_available": any(LLM_MODEL in m for m in models),
@@ -51,62 +82,82 @@ def _check_ollama() -> dict:
             }
     except Exception:
         pass
-    return {
-        "running": False,
-        "models": [],
-        "primary_available": False,
-        "fallback_available": False,
-    }
+    _ollama_status = (time.monotonic(), result)
+    return result
 
 
+@cached(TTLCache(maxsize=4096, ttl=STATUS_TTL_S), lock=threading.Lock())
 def _count_faiss_vectors(index_dir: str) -> int:
-    """Count vectors in a FAISS index directory."""
-    index_path = os.path.join(index_dir, "index.faiss")
-    if not os.path.exists(index_path):
-        return 0
+    """Count vectors in a FAISS index directory (reads only the file header)."""
     try:
-        import faiss
-        idx = faiss.read_index(index_path)
-        return idx.ntotal
+        return VectorStore.count_on_disk(index_dir)
     except Exception:
         return -1
 
 
-@router.get("/status", dependencies=[Depends(require_role("admin"))])
-def system_status(user: User = Depends(get_current_user)):
-    """Full system status: Ollama, FAISS indexes, disk usage, users."""
-
-    # Users
+def _list_users() -> list[dict]:
     with get_session() as db:
         users = db.exec(select(User)).all()
-        user_list = [
+        return [
             {"username": u.username, "role": u.role, "active": u.active}
             for u in users
         ]
 
-    # Disk usage
-    storage_size = _get_dir_size(STORAGE_DIR)
-    disk = shutil.disk_usage("/")
 
-    # FAISS — library index
+def _count_all_indexes() -> tuple[int, dict[str, int]]:
+    """
+    Library vector count + per-session counts.
+
+    Each count is a 16-byte header read, so this is cheap enough to answer
+    cross-session totals without a global index holding a second copy of
+    every session's vectors.
+    """
     library_vectors = _count_faiss_vectors(
         os.path.join(LIBRARY_STORAGE, "index")
     )
 
-    # FAISS — session indexes
+    # One scandir of the sessions dir; DirEntry.is_dir needs no extra stat.
+    # A session without an index yet has no index.faiss and counts 0.
     session_indexes = {}
-    sessions_dir = SESSION_STORAGE
-    if os.path.exists(sessions_dir):
-        for sid in os.listdir(sessions_dir):
-            idx_dir = os.path.join(sessions_dir, sid, "index")
-            if os.path.isdir(idx_dir):
-                session_indexes[sid] = _count_faiss_vectors(idx_dir)
+    try:
+        with os.scandir(SESSION_STORAGE) as it:
+            for entry in it:
+                idx_dir = os.path.join(entry.path, "index")
+                if entry.is_dir() and os.path.isdir(idx_dir):
+                    session_indexes[entry.name] = _count_faiss_vectors(idx_dir)
+    except FileNotFoundError:
+        pass
+    return library_vectors, session_indexes
+
+
+@router.get("/status", dependencies=[Depends(require_role("admin"))])
+async def system_status(request: Request, user: User = Depends(get_current_user)):
+    """
+    Full system status: Ollama, FAISS indexes, disk usage, users.
+
+    The Ollama probe runs on the shared async client while the blocking
+    probes (DB, directory walk, index headers) run in worker threads, all
+    concurrently — latency is the slowest probe, not their sum.
+    """
+    ollama, user_list, storage_size, disk, (library_vectors, session_indexes) = (
+        await asyncio.gather(
+            _check_ollama(request.app.state.ollama),
+            asyncio.to_thread(_list_users),
+            asyncio.to_thread(_get_dir_size, STORAGE_DIR),
+            asyncio.to_thread(shutil.disk_usage, "/"),
+            asyncio.to_thread(_count_all_indexes),
+        )
+    )
 
     return {
-        "ollama": _check_ollama(),
+        "ollama": ollama,
         "faiss": {
             "library_vectors": library_vectors,
             "session_indexes": session_indexes,
+            # Unreadable indexes report -1; leave them out of the total
+            "total_vectors": sum(
+                n for n in (library_vectors, *session_indexes.values()) if n > 0
+            ),
         },
         "disk": {
             "storage_bytes": storage_size,
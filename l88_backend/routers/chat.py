@@ -5,6 +5,7 @@ POST /sessions/{id}/chat — run agentic RAG graph.
 GET  /sessions/{id}/messages — fetch chat history.
 """
 
+from collections import defaultdict
 from typing import List
 import json
 from fastapi import APIRouter, Depends
@@ -43,6 +44,23 @@ def get_messages(session_id: str, user: User = Depends(get_current_user)):
             .order_by(Message.created_at)
         ).all()
 
+        # All citations for the session's assistant messages in one query
+        assistant_ids = [m.id for m in messages if m.role == "assistant"]
+        sources: dict[str, list[dict]] = defaultdict(list)
+        if assistant_ids:
+            citations = db.exec(
+                select(Citation)
+                .where(Citation.message_id.in_(assistant_ids))
+                .order_by(Citation.id)
+            ).all()
+            for c in citations:
+                sources[c.message_id].append({
+                    "filename": c.filename,
+                    "page": c.page,
+                    "source": c.source,
+                    "excerpt": c.excerpt,
+                })
+
         result = []
         for msg in messages:
             msg_dict = {
@@ -57,18 +75,7 @@ def get_messages(session_id: str, user: User = Depends(get_current_user)):
                 "created_at": msg.created_at.isoformat(),
             }
             if msg.role == "assistant":
-                citations = db.exec(
-                    select(Citation).where(Citation.message_id == msg.id)
-                ).all()
-                msg_dict["sources"] = [
-                    {
-                        "filename": c.filename,
-                        "page": c.page,
-                        "source": c.source,
-                        "excerpt": c.excerpt,
-                    }
-                    for c in citations
-                ]
+                msg_dict["sources"] = sources.get(msg.id, [])
             result.append(msg_dict)
 
     return result
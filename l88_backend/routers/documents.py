@@ -2,7 +2,7 @@
 Documents router — upload, list, select, delete session documents.
 """
 
-from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, status
 from pydantic import BaseModel
 
 from l88_backend.services.auth_service import get_current_user, require_session_role
@@ -28,15 +28,20 @@ def list_documents(session_id: str, user: User = Depends(get_current_user)):
     return list_session_documents(session_id)
 
 
-@router.post("/documents")
+@router.post("/documents", status_code=status.HTTP_202_ACCEPTED)
 def upload_document(
     session_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user: User = Depends(get_current_user),
 ):
-    """Upload a PDF document. Requires admin role in session."""
+    """
+    Upload a PDF document. Requires admin role in session.
+
+    Returns the Document with status="processing"; ingestion finishes in the background.
+    """
     _check_admin(user, session_id)
-    return ingest_document(session_id, file, user.id)
+    return ingest_document(session_id, file, user.id, background_tasks)
 
 
 @router.delete("/documents/{doc_id}")
@@ -0,0 +1,81 @@
+"""
+Semantic cache — approximate-match lookup over L2-normalized query embeddings.
+
+Exact key hit first, else the nearest stored embedding by inner product
+(== cosine for normalized vectors) if it clears `threshold`. Vectors live in
+a contiguous float32 matrix that grows by doubling up to `capacity`; once
+full, the least-recently-used slot is overwritten in place, so eviction never
+shifts the matrix the way FAISS IndexFlat.remove_ids would.
+"""
+
+import threading
+
+import numpy as np
+
+
+class SemanticCache:
+    """Bounded LRU cache keyed by string with cosine-similarity fallback."""
+
+    def __init__(self, capacity: int = 10_000, threshold: float = 0.95):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vecs: np.ndarray | None = None     # (rows, dim), first `_size` valid
+        self._keys: list[str] = []
+        self._values: list[dict] = []
+        self._last_used: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._slots: dict[str, int] = {}         # key → row
+        self._size = 0
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, embedding: np.ndarray) -> dict | None:
+        """Return the cached value for `key`, or for a near-duplicate embedding."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None and self._size:
+                scores = self._vecs[:self._size] @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = best
+            if slot is None:
+                return None
+            self._touch(slot)
+            return self._values[slot]
+
+    def put(self, key: str, embedding: np.ndarray, value: dict) -> None:
+        """Insert or refresh `key`, evicting the least-recently-used entry when full."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._free_slot(embedding.shape[0])
+                self._slots[key] = slot
+            self._vecs[slot] = embedding
+            self._keys[slot] = key
+            self._values[slot] = value
+            self._touch(slot)
+
+    def _touch(self, slot: int) -> None:
+        self._tick += 1
+        self._last_used[slot] = self._tick
+
+    def _free_slot(self, dim: int) -> int:
+        """Next unused row, growing storage or evicting the LRU row as needed."""
+        if self._vecs is None:
+            rows = min(256, self.capacity)
+            self._vecs = np.zeros((rows, dim), dtype=np.float32)
+            self._last_used = np.zeros(rows, dtype=np.int64)
+        if self._size < self._vecs.shape[0]:
+            slot = self._size
+        elif self._size < self.capacity:
+            rows = min(self._vecs.shape[0] * 2, self.capacity)
+            self._vecs = np.resize(self._vecs, (rows, dim))
+            self._last_used = np.resize(self._last_used, rows)
+            slot = self._size
+        else:
+            slot = int(np.argmin(self._last_used))
+            del self._slots[self._keys[slot]]
+            return slot
+        self._size += 1
+        self._keys.append("")
+        self._values.append({})
+        return slot
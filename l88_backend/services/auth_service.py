@@ -2,8 +2,14 @@
 Auth service — JWT token management, password verification, role enforcement.
 
 Provides FastAPI dependencies for protecting endpoints by role.
+
+Resolved bearer tokens are cached for TOKEN_CACHE_TTL_S, so most requests
+skip both the JWT decode and the User lookup. A cached entry is still
+rejected once the token's own exp passes.
 """
 
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -11,10 +17,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 import bcrypt
+from cachetools import TTLCache
 from sqlmodel import select
 
 from l88_backend.config import (
-    JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_MINUTES, ROLE_HIERARCHY,
+    JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRE_MINUTES, ROLE_HIERARCHY, TOKEN_CACHE_TTL_S,
 )
 from l88_backend.database import get_session
 from l88_backend.models.user import User
@@ -22,6 +29,9 @@ from l88_backend.models.member import SessionMember
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_S)  # token → (User, exp)
+_token_lock = threading.Lock()
+
 
 # ── Password Helpers ─────────────────────────────────────────────────
 
@@ -79,12 +89,19 @@ def authenticate_user(username: str, password: str) -> User:
 
 def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Resolve the current user from the JWT bearer token."""
+    with _token_lock:
+        hit = _token_cache.get(token)
+    if hit is not None and time.time() < hit[1]:
+        return hit[0]
+
     payload = decode_token(token)
     user_id = int(payload["sub"])
     with get_session() as db:
         user = db.get(User, user_id)
     if not user or not user.active:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "User not found or inactive")
+    with _token_lock:
+        _token_cache[token] = (user, payload["exp"])
     return user
 
 
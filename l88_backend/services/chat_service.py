@@ -25,13 +25,20 @@ def run_chat(session_id: str, query: str, user_id: int) -> dict:
     """
     Run the full chat flow.
 
-    1. Load session (type, web_mode)
-    2. Validate sources
+    1. Check the response cache — a hit returns without touching the DB
+    2. Load session (type, web_mode)
     3. Load selected_doc_ids
     4. Run graph
-    5. Save messages + citations
+    5. Save user message + assistant message + citations in one transaction
     6. Return response
     """
+    # Check cache first. Changes to what a session answers from (docs,
+    # selection, web_mode) and session deletion invalidate its entries, so
+    # a hit needs no session read.
+    cached = cache_get(session_id, query)
+    if cached:
+        return cached
+
     # Load session
     with get_session() as db:
         session = db.get(Session, session_id)
@@ -42,21 +49,15 @@ def run_chat(session_id: str, query: str, user_id: int) -> dict:
     # will route to "chat" and the LLM answers from trained knowledge.
     selected_doc_ids = get_selected_doc_ids(session_id)
 
-
-    # Save user message
-    user_msg_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc)
+    # User message — persisted with the reply below
     user_msg = Message(
-        id=user_msg_id,
+        id=str(uuid.uuid4()),
         session_id=session_id,
         user_id=user_id,
         role="user",
         content=query,
-        created_at=now,
+        created_at=datetime.now(timezone.utc),
     )
-    with get_session() as db:
-        db.add(user_msg)
-        db.commit()
 
     # Run graph
     initial_state = {
@@ -70,13 +71,9 @@ def run_chat(session_id: str, query: str, user_id: int) -> dict:
         "chunks": [],
         "found": False,
         "rewritten_queries": None,
+        "rewrite_plan": [],
     }
 
-    # Check cache before running graph
-    cached = cache_get(session_id, query)
-    if cached:
-        return cached
-
     result = _graph.invoke(initial_state)
 
     # Save assistant message
@@ -96,9 +93,8 @@ def run_chat(session_id: str, query: str, user_id: int) -> dict:
     )
 
     # Save citations
-    citations = []
-    for src in result.get("sources", []):
-        citation = Citation(
+    citations = [
+        Citation(
             message_id=asst_msg_id,
             document_id=src.get("doc_id", ""),
             filename=src.get("filename", ""),
@@ -106,12 +102,11 @@ def run_chat(session_id: str, query: str, user_id: int) -> dict:
             source=src.get("source", "session"),
             excerpt=src.get("excerpt", ""),
         )
-        citations.append(citation)
+        for src in result.get("sources", [])
+    ]
 
     with get_session() as db:
-        db.add(asst_msg)
-        for c in citations:
-            db.add(c)
+        db.add_all([user_msg, asst_msg, *citations])
         db.commit()
 
     # Return response
@@ -1,42 +1,56 @@
 """
 Document service — ingestion pipeline + FAISS storage.
 
-Handles: validate PDF → save to disk → parse → chunk → embed → FAISS store → DB record.
+Handles: validate PDF → save to disk → DB record ("processing") → background
+parse → chunk → embed → FAISS + BM25 store → status "ready".
 Also handles delete: remove from FAISS + disk + DB.
 """
 
 import os
 import uuid
 import json
-import shutil
+import threading
 from datetime import datetime, timezone
 
+from cachetools import TTLCache
 from fastapi import HTTPException, UploadFile, status, BackgroundTasks
 from sqlmodel import select
 
-from l88_backend.config import SESSION_STORAGE
+from l88_backend.config import SESSION_STORAGE, SELECTED_IDS_TTL_S
 from l88_backend.database import get_session
 from l88_backend.models.document import Document
-from l88_backend.ingestion.parser import parse_pdf
-from l88_backend.ingestion.chunker import chunk_pages
-from l88_backend.ingestion.embedder import embed_texts
+from l88_backend.ingestion.pipeline import parse_and_chunk, save_upload
+from l88_backend.ingestion import embed_queue
+from l88_backend.retrieval import index_writer
 from l88_backend.retrieval.vectorstore import VectorStore
 from l88_backend.services.session_service import update_session_type
 from l88_backend.cache import cache_invalidate_session
 from l88_backend.retrieval.bm25store import BM25Store
 
-def ingest_document(session_id: str, file: UploadFile, user_id: int) -> Document:
+# session_id → selected doc IDs, read on every chat turn. Dropped on upload,
+# delete and toggle in this process; the TTL bounds staleness from others.
+_selected_ids_cache: TTLCache = TTLCache(maxsize=4096, ttl=SELECTED_IDS_TTL_S)
+_selected_ids_lock = threading.Lock()
+
+
+def _forget_selected_ids(session_id: str):
+    with _selected_ids_lock:
+        _selected_ids_cache.pop(session_id, None)
+
+
+def ingest_document(
+    session_id: str, file: UploadFile, user_id: int, background_tasks: BackgroundTasks = None,
+) -> Document:
     """
-    Full ingestion pipeline for a session document.
+    Accept a session document and queue its ingestion.
 
     1. Validate: PDF only
     2. Save to storage/sessions/{session_id}/docs/{doc_id}.pdf
-    3. Parse with PyMuPDF
-    4. Chunk with pysbd + RecursiveCharacterTextSplitter
-    5. Embed with BGE-base
-    6. Add to session FAISS index
-    7. Save Document record
-    8. Update session type (general → rag)
+    3. Save Document record with status="processing"
+    4. Schedule _ingest_worker (parse → chunk → embed → FAISS + BM25)
+
+    The response returns once the PDF is on disk; clients poll the document
+    list until status leaves "processing".
     """
     # Validate
     if not file.filename or not file.filename.lower().endswith(".pdf"):
@@ -50,36 +64,7 @@ def ingest_document(session_id: str, file: UploadFile, user_id: int) -> Document
     os.makedirs(doc_dir, exist_ok=True)
     filepath = os.path.join(doc_dir, f"{doc_id}.pdf")
 
-    with open(filepath, "wb") as f:
-        content = file.file.read()
-        f.write(content)
-
-    # Parse
-    pages = parse_pdf(filepath, filename)
-
-    # Chunk
-    chunks = chunk_pages(pages)
-
-    # Add doc_id and source to chunk metadata
-    for chunk in chunks:
-        chunk["doc_id"] = doc_id
-        chunk["source"] = "session"
-
-    # Embed
-    texts = [c["text"] for c in chunks]
-    embeddings = embed_texts(texts) if texts else None
-
-    # FAISS store
-    index_dir = os.path.join(SESSION_STORAGE, session_id, "index")
-    store = VectorStore.load(index_dir)
-    if embeddings is not None:
-        store.add_chunks(chunks, embeddings)
-    store.save(index_dir)
-
-    # BM25 store
-    bm25_store = BM25Store.load(index_dir)
-    bm25_store.add_chunks(chunks)
-    bm25_store.save(index_dir)
+    save_upload(file, filepath)
 
     # DB record
     doc = Document(
@@ -89,14 +74,81 @@ def ingest_document(session_id: str, file: UploadFile, user_id: int) -> Document
         source="session",
         uploaded_by=user_id,
         uploaded_at=datetime.now(timezone.utc),
-        page_count=len(pages),
-        chunk_count=len(chunks),
         selected=True,
+        status="processing",
     )
     with get_session() as db:
         db.add(doc)
         db.commit()
         db.refresh(doc)
+    _forget_selected_ids(session_id)
+
+    if background_tasks:
+        background_tasks.add_task(_ingest_worker, session_id, doc_id, filepath, filename)
+    else:
+        # Direct call fallback (e.g. called without BackgroundTasks context)
+        _ingest_worker(session_id, doc_id, filepath, filename)
+        index_writer.flush(_index_dir(session_id))
+        with get_session() as db:
+            doc = db.get(Document, doc_id) or doc
+
+    return doc
+
+
+def _ingest_worker(session_id: str, doc_id: str, filepath: str, filename: str):
+    """
+    Parse, chunk and embed one uploaded document into the session indexes.
+    The document turns "ready" once the index writer has saved them (or
+    "failed"). A document deleted mid-ingest is left out of the indexes.
+    """
+    indexing = False
+    try:
+        # Parse + chunk (chunks tagged with doc_id and source)
+        page_count, chunks = parse_and_chunk(filepath, filename, doc_id, "session")
+
+        # Embed — queued: concurrent uploads share one encode
+        texts = [c["text"] for c in chunks]
+        embeddings = embed_queue.submit_many(texts).result() if texts else None
+
+        index_dir = _index_dir(session_id)
+        with index_writer.locked(index_dir):
+            with get_session() as db:
+                if db.get(Document, doc_id) is None:
+                    return   # deleted while parsing / embedding
+
+            indexing = True
+            # FAISS store
+            store = index_writer.open_store(VectorStore, index_dir)
+            if embeddings is not None:
+                store.add_chunks(chunks, embeddings)
+
+            # BM25 store
+            bm25_store = index_writer.open_store(BM25Store, index_dir)
+            bm25_store.add_chunks(chunks)
+
+            index_writer.mark_dirty(
+                index_dir, store, bm25_store,
+                on_flush=lambda: _ingest_done(session_id, doc_id, page_count, len(chunks)),
+            )
+    except Exception as exc:
+        print(f"[INGEST] {filename} ({doc_id}) failed: {exc}")
+        _set_status(doc_id, "failed")
+        if indexing:
+            # A store already pending for this session may hold part of the
+            # doc (vectors added, BM25 failed); take it back out before saving
+            _remove_from_session_index(session_id, doc_id)
+
+
+def _ingest_done(session_id: str, doc_id: str, page_count: int, chunk_count: int):
+    """Runs once the doc's chunks are on disk, i.e. searchable."""
+    with get_session() as db:
+        doc = db.get(Document, doc_id)
+        if doc is not None:
+            doc.page_count = page_count
+            doc.chunk_count = chunk_count
+            doc.status = "ready"
+            db.add(doc)
+            db.commit()
 
     # Update session type
     update_session_type(session_id)
@@ -104,13 +156,24 @@ def ingest_document(session_id: str, file: UploadFile, user_id: int) -> Document
     # Invalidate cache — new doc changes what the session knows
     cache_invalidate_session(session_id)
 
-    return doc
+
+def _set_status(doc_id: str, doc_status: str):
+    with get_session() as db:
+        doc = db.get(Document, doc_id)
+        if doc is not None:
+            doc.status = doc_status
+            db.add(doc)
+            db.commit()
+
+
+def _index_dir(session_id: str) -> str:
+    return os.path.join(SESSION_STORAGE, session_id, "index")
 
 
 def delete_document(session_id: str, doc_id: str, background_tasks: BackgroundTasks = None):
     """
-    Delete a document: remove from DB and disk.
-    Index rebuild runs in the background so the HTTP response returns immediately.
+    Delete a document: remove from DB, disk and the session indexes.
+    Index removal runs in the background so the HTTP response returns immediately.
     """
     with get_session() as db:
         doc = db.get(Document, doc_id)
@@ -118,23 +181,21 @@ def delete_document(session_id: str, doc_id: str, background_tasks: BackgroundTa
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Document not found")
         db.delete(doc)
         db.commit()
+    _forget_selected_ids(session_id)
 
     # Remove PDF file
     filepath = os.path.join(SESSION_STORAGE, session_id, "docs", f"{doc_id}.pdf")
     if os.path.exists(filepath):
         os.remove(filepath)
 
-    # Schedule the slow FAISS+BM25 rebuild in the background
-    def _rebuild():
-        _rebuild_session_index(session_id)
-        update_session_type(session_id)
-        cache_invalidate_session(session_id)
-
+    # Drop the doc's vectors + BM25 chunks in place — nothing is re-embedded
+    update_session_type(session_id)
     if background_tasks:
-        background_tasks.add_task(_rebuild)
+        background_tasks.add_task(_remove_from_session_index, session_id, doc_id)
     else:
         # Direct call fallback (e.g. called without BackgroundTasks context)
-        _rebuild()
+        _remove_from_session_index(session_id, doc_id)
+        index_writer.flush(_index_dir(session_id))
 
 
 def toggle_document_selection(session_id: str, doc_id: str, selected: bool) -> Document:
@@ -147,6 +208,9 @@ def toggle_document_selection(session_id: str, doc_id: str, selected: bool) -> D
         db.add(doc)
         db.commit()
         db.refresh(doc)
+    _forget_selected_ids(session_id)
+    # Cached answers were retrieved from the old selection
+    cache_invalidate_session(session_id)
     return doc
 
 
@@ -163,51 +227,37 @@ def list_session_documents(session_id: str) -> list[Document]:
 
 
 def get_selected_doc_ids(session_id: str) -> list[str]:
-    """Get IDs of all selected documents in a session."""
-    with get_session() as db:
-        docs = db.exec(
-            select(Document).where(
-                Document.session_id == session_id,
-                Document.source == "session",
-                Document.selected == True,
-            )
-        ).all()
-    return [d.id for d in docs]
-
-
-def _rebuild_session_index(session_id: str):
-    """Rebuild the FAISS index for a session from remaining docs on disk."""
-    index_dir = os.path.join(SESSION_STORAGE, session_id, "index")
-    doc_dir = os.path.join(SESSION_STORAGE, session_id, "docs")
-
-    # Get remaining docs from DB
-    with get_session() as db:
-        docs = db.exec(
-            select(Document).where(
-                Document.session_id == session_id,
-                Document.source == "session",
+    """Get IDs of all selected documents in a session (cached per session)."""
+    with _selected_ids_lock:
+        ids = _selected_ids_cache.get(session_id)
+    if ids is None:
+        with get_session() as db:
+            ids = db.exec(
+                select(Document.id).where(
+                    Document.session_id == session_id,
+                    Document.source == "session",
+                    Document.selected == True,
+                )
+            ).all()
+        with _selected_ids_lock:
+            _selected_ids_cache[session_id] = ids = tuple(ids)
+    return list(ids)
+
+
+def _remove_from_session_index(session_id: str, doc_id: str):
+    """
+    Remove one document's chunks from the session FAISS and BM25 indexes;
+    the response cache is invalidated once the change is saved.
+    """
+    index_dir = _index_dir(session_id)
+
+    with index_writer.locked(index_dir):
+        store = index_writer.open_store(VectorStore, index_dir)
+        bm25_store = index_writer.open_store(BM25Store, index_dir)
+        dirty = [s for s in (store, bm25_store) if s.remove_doc(doc_id)]
+        if dirty:
+            index_writer.mark_dirty(
+                index_dir, *dirty, on_flush=lambda: cache_invalidate_session(session_id),
             )
-        ).all()
-
-    store = VectorStore()
-    bm25_store = BM25Store()
-
-    for doc in docs:
-        filepath = os.path.join(doc_dir, f"{doc.id}.pdf")
-        if not os.path.exists(filepath):
-            continue
-
-        pages = parse_pdf(filepath, doc.filename)
-        chunks = chunk_pages(pages)
-        for chunk in chunks:
-            chunk["doc_id"] = doc.id
-            chunk["source"] = "session"
-
-        texts = [c["text"] for c in chunks]
-        if texts:
-            embeddings = embed_texts(texts)
-            store.add_chunks(chunks, embeddings)
-            bm25_store.add_chunks(chunks)
-
-    store.save(index_dir)
-    bm25_store.save(index_dir)
\ No newline at end of file
+        else:
+            cache_invalidate_session(session_id)
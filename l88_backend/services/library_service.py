@@ -2,7 +2,8 @@
 Library service — curated library management.
 
 Admin-managed global library. Not session-scoped.
-Lives at storage/library/. Has its own FAISS index.
+Lives at storage/library/. Has its own FAISS index, updated incrementally:
+uploads append their vectors, deletes remove just that document's.
 """
 
 import os
@@ -12,13 +13,14 @@ from datetime import datetime, timezone
 from fastapi import HTTPException, UploadFile, status
 from sqlmodel import select
 
-from l88_backend.config import LIBRARY_STORAGE
+from l88_backend.config import LIBRARY_STORAGE, LIBRARY_INDEX_TYPE, LIBRARY_HNSW_MIN_VECTORS
 from l88_backend.database import get_session
 from l88_backend.models.document import Document
-from l88_backend.ingestion.parser import parse_pdf
-from l88_backend.ingestion.chunker import chunk_pages
-from l88_backend.ingestion.embedder import embed_texts
+from l88_backend.ingestion.pipeline import parse_and_chunk, save_upload
+from l88_backend.ingestion import embed_queue
+from l88_backend.retrieval import index_writer
 from l88_backend.retrieval.vectorstore import VectorStore
+from l88_backend.services.source_service import invalidate_library_index_cache
 
 
 def upload_library_doc(file: UploadFile, user_id: int) -> Document:
@@ -28,7 +30,10 @@ def upload_library_doc(file: UploadFile, user_id: int) -> Document:
     Same ingestion pipeline as session docs, but:
     - Saved to storage/library/docs/
     - Added to shared library FAISS index
-    - Document record: source="library", session_id=None
+    - Document record: source="library", session_id=None, saved before
+      parsing with status="processing"; "ready" once the index is saved
+    - On a parse / embed / index failure the file, row and any vectors
+      are removed again
     """
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Only PDF files are accepted")
@@ -41,27 +46,10 @@ def upload_library_doc(file: UploadFile, user_id: int) -> Document:
     os.makedirs(doc_dir, exist_ok=True)
     filepath = os.path.join(doc_dir, f"{doc_id}.pdf")
 
-    with open(filepath, "wb") as f:
-        f.write(file.file.read())
+    save_upload(file, filepath)
 
-    # Parse → chunk → embed
-    pages = parse_pdf(filepath, filename)
-    chunks = chunk_pages(pages)
-    for chunk in chunks:
-        chunk["doc_id"] = doc_id
-        chunk["source"] = "library"
-
-    texts = [c["text"] for c in chunks]
-    embeddings = embed_texts(texts) if texts else None
-
-    # Add to library FAISS index
-    index_dir = os.path.join(LIBRARY_STORAGE, "index")
-    store = VectorStore.load(index_dir)
-    if embeddings is not None:
-        store.add_chunks(chunks, embeddings)
-    store.save(index_dir)
-
-    # DB record
+    # DB record first: every file and vector below belongs to a row that
+    # delete_library_doc can find
     doc = Document(
         id=doc_id,
         session_id=None,
@@ -69,20 +57,76 @@ def upload_library_doc(file: UploadFile, user_id: int) -> Document:
         source="library",
         uploaded_by=user_id,
         uploaded_at=datetime.now(timezone.utc),
-        page_count=len(pages),
-        chunk_count=len(chunks),
         selected=True,
+        status="processing",
     )
     with get_session() as db:
         db.add(doc)
         db.commit()
         db.refresh(doc)
 
+    index_dir = os.path.join(LIBRARY_STORAGE, "index")
+    try:
+        # Parse → chunk → embed
+        page_count, chunks = parse_and_chunk(filepath, filename, doc_id, "library")
+
+        texts = [c["text"] for c in chunks]
+        # Queued: concurrent uploads share one encode
+        embeddings = embed_queue.submit_many(texts).result() if texts else None
+
+        # Append to library FAISS index
+        with index_writer.locked(index_dir):
+            with get_session() as db:
+                if db.get(Document, doc_id) is None:
+                    return doc   # deleted while parsing / embedding
+            store = index_writer.open_store(VectorStore, index_dir, index_type=LIBRARY_INDEX_TYPE)
+            if embeddings is not None:
+                store.add_chunks(chunks, embeddings)
+            if store.count >= LIBRARY_HNSW_MIN_VECTORS:
+                store.to_hnsw()
+            index_writer.mark_dirty(
+                index_dir, store,
+                on_flush=lambda: _library_doc_ready(doc_id, page_count, len(chunks)),
+            )
+    except Exception:
+        _discard_library_doc(doc_id, filepath, index_dir)
+        raise
+
+    doc.page_count = page_count
+    doc.chunk_count = len(chunks)
     return doc
 
 
+def _library_doc_ready(doc_id: str, page_count: int, chunk_count: int):
+    """Runs once the doc's vectors are on disk, i.e. searchable."""
+    with get_session() as db:
+        doc = db.get(Document, doc_id)
+        if doc is not None:
+            doc.page_count = page_count
+            doc.chunk_count = chunk_count
+            doc.status = "ready"
+            db.add(doc)
+            db.commit()
+    invalidate_library_index_cache()
+
+
+def _discard_library_doc(doc_id: str, filepath: str, index_dir: str):
+    """Undo a failed upload: its vectors (if any got in), its row and its file."""
+    with index_writer.locked(index_dir):
+        store = index_writer.open_store(VectorStore, index_dir, index_type=LIBRARY_INDEX_TYPE)
+        if store.remove_doc(doc_id):
+            index_writer.mark_dirty(index_dir, store)
+    with get_session() as db:
+        doc = db.get(Document, doc_id)
+        if doc is not None:
+            db.delete(doc)
+            db.commit()
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+
 def delete_library_doc(doc_id: str):
-    """Delete a library doc and rebuild the library FAISS index."""
+    """Delete a library doc and drop its vectors from the library FAISS index."""
     with get_session() as db:
         doc = db.get(Document, doc_id)
         if not doc or doc.source != "library":
@@ -95,8 +139,12 @@ def delete_library_doc(doc_id: str):
     if os.path.exists(filepath):
         os.remove(filepath)
 
-    # Rebuild library index
-    _rebuild_library_index()
+    # Remove its vectors in place — nothing is re-embedded
+    index_dir = os.path.join(LIBRARY_STORAGE, "index")
+    with index_writer.locked(index_dir):
+        store = index_writer.open_store(VectorStore, index_dir, index_type=LIBRARY_INDEX_TYPE)
+        if store.remove_doc(doc_id):
+            index_writer.mark_dirty(index_dir, store, on_flush=invalidate_library_index_cache)
 
 
 def list_library_docs() -> list[Document]:
@@ -107,33 +155,3 @@ def list_library_docs() -> list[Document]:
         ).all()
     return list(docs)
 
-
-def _rebuild_library_index():
-    """Rebuild the entire library FAISS index from remaining docs."""
-    index_dir = os.path.join(LIBRARY_STORAGE, "index")
-    doc_dir = os.path.join(LIBRARY_STORAGE, "docs")
-
-    with get_session() as db:
-        docs = db.exec(
-            select(Document).where(Document.source == "library")
-        ).all()
-
-    store = VectorStore()
-
-    for doc in docs:
-        filepath = os.path.join(doc_dir, f"{doc.id}.pdf")
-        if not os.path.exists(filepath):
-            continue
-
-        pages = parse_pdf(filepath, doc.filename)
-        chunks = chunk_pages(pages)
-        for chunk in chunks:
-            chunk["doc_id"] = doc.id
-            chunk["source"] = "library"
-
-        texts = [c["text"] for c in chunks]
-        if texts:
-            embeddings = embed_texts(texts)
-            store.add_chunks(chunks, embeddings)
-
-    store.save(index_dir)
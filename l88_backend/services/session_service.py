@@ -2,19 +2,23 @@
 Session service — create, list, delete sessions with automatic type transitions.
 """
 
+import os
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlmodel import select
+from sqlmodel import delete, func, select
 
+from l88_backend.cache import cache_invalidate_session
+from l88_backend.config import SESSION_STORAGE
 from l88_backend.database import get_session
 from l88_backend.models.session import Session
 from l88_backend.models.document import Document
 from l88_backend.models.member import SessionMember
 from l88_backend.models.scratchpad import ScratchPad
 from l88_backend.models.message import Message, Citation
+from l88_backend.retrieval import index_writer
 
 
 def create_session(name: str, web_mode: bool, user_id: int) -> Session:
@@ -62,13 +66,13 @@ def list_sessions(user_id: Optional[int] = None) -> list[Session]:
     """List all sessions, optionally filtered by user membership."""
     with get_session() as db:
         if user_id is not None:
-            member_ids = db.exec(
-                select(SessionMember.session_id).where(
-                    SessionMember.user_id == user_id
-                )
-            ).all()
+            # One JOIN instead of fetching member session IDs for an IN list;
+            # DISTINCT keeps IN's one-row-per-session result
             sessions = db.exec(
-                select(Session).where(Session.id.in_(member_ids))
+                select(Session)
+                .join(SessionMember, SessionMember.session_id == Session.id)
+                .where(SessionMember.user_id == user_id)
+                .distinct()
             ).all()
         else:
             sessions = db.exec(select(Session)).all()
@@ -91,29 +95,16 @@ def delete_session(session_id: str):
         if not session:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
 
-        # Delete related records
-        for model in [Citation, Message, Document, SessionMember, ScratchPad]:
-            if model == Citation:
-                # Citations link via message_id, need messages first
-                msg_ids = db.exec(
-                    select(Message.id).where(Message.session_id == session_id)
-                ).all()
-                if msg_ids:
-                    citations = db.exec(
-                        select(Citation).where(Citation.message_id.in_(msg_ids))
-                    ).all()
-                    for c in citations:
-                        db.delete(c)
-            else:
-                field = "session_id"
-                rows = db.exec(
-                    select(model).where(getattr(model, field) == session_id)
-                ).all()
-                for row in rows:
-                    db.delete(row)
+        # One DELETE per table; citations link via message_id → subquery
+        msg_ids = select(Message.id).where(Message.session_id == session_id)
+        db.exec(delete(Citation).where(Citation.message_id.in_(msg_ids)))
+        for model in (Message, Document, SessionMember, ScratchPad):
+            db.exec(delete(model).where(model.session_id == session_id))
 
         db.delete(session)
         db.commit()
+    cache_invalidate_session(session_id)
+    index_writer.evict(os.path.join(SESSION_STORAGE, session_id, "index"))
 
 
 def update_session_type(session_id: str):
@@ -126,12 +117,12 @@ def update_session_type(session_id: str):
         session = db.get(Session, session_id)
         if not session:
             return
-        doc_count = len(db.exec(
-            select(Document).where(
+        doc_count = db.exec(
+            select(func.count()).select_from(Document).where(
                 Document.session_id == session_id,
                 Document.source == "session",
             )
-        ).all())
+        ).one()
         new_type = "rag" if doc_count > 0 else "general"
         if session.session_type != new_type:
             session.session_type = new_type
@@ -149,6 +140,8 @@ def toggle_web_mode(session_id: str, web_mode: bool) -> Session:
         db.add(session)
         db.commit()
         db.refresh(session)
+    # Cached answers came from the other source set
+    cache_invalidate_session(session_id)
     return session
 
 
@@ -2,12 +2,32 @@
 Source service — resolve which FAISS indexes to query at query time.
 
 Determines source indexes based on web_mode + selected docs.
+
+Whether the library index exists is remembered after the first check;
+library uploads and deletes call invalidate_library_index_cache() once
+their index changes are saved.
 """
 
 import os
 
 from l88_backend.config import SESSION_STORAGE, LIBRARY_STORAGE
 
+_LIBRARY_INDEX = os.path.join(LIBRARY_STORAGE, "index")
+_library_index_exists: bool | None = None
+
+
+def _library_index_ready() -> bool:
+    global _library_index_exists
+    if _library_index_exists is None:
+        _library_index_exists = os.path.exists(os.path.join(_LIBRARY_INDEX, "index.faiss"))
+    return _library_index_exists
+
+
+def invalidate_library_index_cache() -> None:
+    """Re-check library index existence on the next resolve_sources call."""
+    global _library_index_exists
+    _library_index_exists = None
+
 
 def resolve_sources(session_id: str, selected_doc_ids: list[str], web_mode: bool) -> list[dict]:
     """
@@ -35,11 +55,10 @@ def resolve_sources(session_id: str, selected_doc_ids: list[str], web_mode: bool
 
     if web_mode:
         # Curated library
-        library_index = os.path.join(LIBRARY_STORAGE, "index")
-        if os.path.exists(os.path.join(library_index, "index.faiss")):
+        if _library_index_ready():
             sources.append({
                 "type": "library",
-                "index_path": library_index,
+                "index_path": _LIBRARY_INDEX,
             })
         # Training data — implicit when web_mode=ON
         # Generator prompt is not restricted to chunks only
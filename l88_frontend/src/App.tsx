@@ -55,6 +55,17 @@ function Dashboard() {
         else { setMessages([]); setDocuments([]); }
     }, [current?.id, loadData]);
 
+    /* ── Poll while documents are ingesting in the background ── */
+    const processing = documents.some(d => d.status === 'processing');
+    useEffect(() => {
+        if (!current || !processing) return;
+        const id = current.id;
+        const timer = setInterval(() => {
+            api.getDocuments(id).then(setDocuments).catch(() => { });
+        }, 2000);
+        return () => clearInterval(timer);
+    }, [current?.id, processing]);
+
     /* ── Sessions ── */
     const handleCreate = async (name: string, withDocs: boolean) => {
         try {
@@ -139,7 +139,9 @@ export default function RightPanel({
                                     {doc.filename}
                                 </p>
                                 <p className="text-[10px] text-neutral-400 dark:text-neutral-500">
-                                    {doc.page_count}p · {doc.chunk_count} chunks
+                                    {doc.status === 'processing' ? 'Processing…'
+                                        : doc.status === 'failed' ? 'Ingestion failed'
+                                        : `${doc.page_count}p · ${doc.chunk_count} chunks`}
                                 </p>
                             </div>
                             {isAdmin && (
@@ -25,6 +25,7 @@ export interface Document {
     chunk_count: number;
     selected: boolean;
     uploaded_at: string;
+    status: 'processing' | 'ready' | 'failed';
 }
 
 /** Matches the shape returned by both POST /chat and GET /messages */
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+import pytest
+
+from l88_backend import disk_cache
+from l88_backend.disk_cache import DiskCache
+
+
+class _FailOnce:
+    """Connection proxy whose first executemany raises, like a locked database."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.failed = False
+
+    def executemany(self, *args):
+        if not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.executemany(*args)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _wait_for(cache, key, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is not None:
+            return value
+        time.sleep(0.02)
+    return None
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_STORAGE", str(tmp_path))
+    monkeypatch.setattr(disk_cache, "FLUSH_EVERY_S", 0.01)
+    monkeypatch.setattr(DiskCache, "_conn", None)
+    return DiskCache("test", ttl_seconds=60)
+
+
+def test_flusher_survives_a_failed_flush(cache):
+    with DiskCache._lock:
+        DiskCache._db()
+        proxy = DiskCache._conn = _FailOnce(DiskCache._conn)
+
+    cache.put(b"lost", {"v": 1})
+    deadline = time.monotonic() + 5.0
+    while not proxy.failed and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert proxy.failed
+
+    cache.put(b"kept", {"v": 2})
+    assert _wait_for(cache, b"kept") == {"v": 2}
+    assert cache.get(b"lost") is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from l88_backend.ingestion import embedder
+
+
+class _MemoryCache:
+    def __init__(self):
+        self.rows: dict[bytes, bytes] = {}
+
+    def get_blobs(self, keys):
+        return {k: self.rows[k] for k in keys if k in self.rows}
+
+    def put_blob(self, key, value):
+        self.rows[key] = value
+
+
+def _fake_encode(texts):
+    out = np.random.default_rng(len(texts)).random((len(texts), 8), dtype=np.float32)
+    return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def passages(monkeypatch):
+    monkeypatch.setattr(embedder, "_passage_cache", _MemoryCache())
+    monkeypatch.setattr(embedder, "_encode", _fake_encode)
+
+
+def _assert_faiss_layout(embeddings, n):
+    assert embeddings.shape == (n, 8)
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+
+
+def test_passage_embeddings_are_float32_c_contiguous(passages):
+    # All new and distinct: the encoder output is returned as is
+    _assert_faiss_layout(embedder._embed_passages(["a", "b", "c"]), 3)
+    # Cached + new + duplicate: rows are assembled from the stored bytes
+    _assert_faiss_layout(embedder._embed_passages(["a", "d", "a"]), 3)
+
+
+def test_embed_texts_does_not_copy_passage_embeddings(passages, monkeypatch):
+    result = embedder._embed_passages(["x", "y"])
+    monkeypatch.setattr(embedder, "_embed_passages", lambda texts: result)
+    assert embedder.embed_texts(["x", "y"]) is result